@@ -1,84 +1,245 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
-import requests
-from functools import lru_cache
+import jwt
+from jwt import InvalidTokenError, PyJWK
+import asyncio
+import base64
+import binascii
+import httpx
+import hashlib
+import json
+import time
+from functools import lru_cache, partial
 from datetime import datetime, timedelta
 from auth0_config import AUTH0_DOMAIN, AUTH0_API_AUDIENCE, AUTH0_ISSUER, AUTH0_ALGORITHMS
 
 security = HTTPBearer()
 
-# Cache JWKS with timestamp for TTL
-_jwks_cache = {"data": None, "expires_at": None}
+# Cache public keys built from the JWKS, with timestamp for TTL
+_jwks_cache = {"keys": None, "expires_at": None, "fetched_at": None}
 
+# Minimum time between forced JWKS refetches triggered by an unknown kid
+JWKS_MIN_REFRESH_INTERVAL = timedelta(seconds=30)
 
-def get_jwks():
+# Reused across fetches so the Auth0 connection is kept alive; built on first use
+# and cleared by close_jwks_client so each app startup gets a fresh client and lock
+# bound to its own event loop
+_jwks_http = {"client": None, "lock": None}
+
+# jwt.decode bound to our fixed Auth0 settings; exp, iss and aud must all be present
+_decode_token = partial(
+    jwt.decode,
+    algorithms=AUTH0_ALGORITHMS,
+    audience=AUTH0_API_AUDIENCE,
+    issuer=AUTH0_ISSUER,
+    options={"require": ["exp", "iss", "aud"]}
+)
+
+# Cache verified token payloads keyed by SHA-256 of the raw token
+TOKEN_CACHE_TTL_SECONDS = 300
+TOKEN_CACHE_MAX_SIZE = 10_000
+_token_cache = {}
+
+# Cache the user dict built for a token so repeat requests skip verification entirely
+USER_CACHE_TTL_SECONDS = 60
+_user_cache = {}
+
+
+def get_jwks_client() -> httpx.AsyncClient:
+    """Return the shared JWKS HTTP client, creating it if needed"""
+    client = _jwks_http["client"]
+    if client is None or client.is_closed:
+        client = _jwks_http["client"] = httpx.AsyncClient(timeout=2.0)
+    return client
+
+
+def _get_jwks_lock() -> asyncio.Lock:
+    if _jwks_http["lock"] is None:
+        _jwks_http["lock"] = asyncio.Lock()
+    return _jwks_http["lock"]
+
+
+async def close_jwks_client():
+    """Close the JWKS HTTP client on shutdown; the next fetch builds a new one"""
+    client = _jwks_http["client"]
+    _jwks_http["client"] = None
+    _jwks_http["lock"] = None
+    if client is not None:
+        await client.aclose()
+
+
+def _cached_keys_valid(now: datetime) -> bool:
+    return bool(_jwks_cache["keys"] and _jwks_cache["expires_at"] and now < _jwks_cache["expires_at"])
+
+
+async def get_public_keys(force_refresh: bool = False) -> dict:
     """
-    Cache the JWKS (JSON Web Key Set) from Auth0
-    Refreshes cache every 10 minutes to handle key rotation
+    Cache the public keys from Auth0's JWKS (JSON Web Key Set), keyed by kid
+    Keys are parsed once per fetch so verification reuses the key objects
+    Refreshes cache every 10 minutes to handle key rotation, or sooner when
+    force_refresh is set (rate limited by JWKS_MIN_REFRESH_INTERVAL)
     """
-    now = datetime.utcnow()
-    
-    # Return cached data if still valid
-    if _jwks_cache["data"] and _jwks_cache["expires_at"] and now < _jwks_cache["expires_at"]:
-        return _jwks_cache["data"]
-    
-    # Fetch fresh JWKS
-    jwks_url = f"https://{AUTH0_DOMAIN}/.well-known/jwks.json"
-    jwks = requests.get(jwks_url).json()
-    
-    # Update cache with 10-minute TTL
-    _jwks_cache["data"] = jwks
-    _jwks_cache["expires_at"] = now + timedelta(minutes=10)
-    
-    return jwks
+    # Return cached keys if still valid
+    if not force_refresh and _cached_keys_valid(datetime.utcnow()):
+        return _jwks_cache["keys"]
+
+    async with _get_jwks_lock():
+        now = datetime.utcnow()
 
+        # Another request may have refreshed the keys while we waited
+        if force_refresh:
+            fetched_at = _jwks_cache["fetched_at"]
+            if fetched_at and now - fetched_at < JWKS_MIN_REFRESH_INTERVAL:
+                return _jwks_cache["keys"]
+        elif _cached_keys_valid(now):
+            return _jwks_cache["keys"]
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+        # Fetch fresh JWKS
+        jwks_url = f"https://{AUTH0_DOMAIN}/.well-known/jwks.json"
+        response = await get_jwks_client().get(jwks_url)
+        response.raise_for_status()
+        jwks = response.json()
+
+        # Only RSA signing keys with a kid can verify our tokens; skip the rest
+        keys = {
+            key["kid"]: PyJWK(key, algorithm=AUTH0_ALGORITHMS[0]).key
+            for key in jwks.get("keys", [])
+            if key.get("kid") and key.get("kty") == "RSA" and key.get("use", "sig") == "sig"
+        }
+
+        # Update cache with 10-minute TTL
+        _jwks_cache["keys"] = keys
+        _jwks_cache["fetched_at"] = now
+        _jwks_cache["expires_at"] = now + timedelta(minutes=10)
+
+        return keys
+
+
+def _token_key(token: str) -> bytes:
+    """
+    Digest a raw bearer token into a fixed-size cache key
+    Header values arrive latin-1 decoded, so encoding back to latin-1 never fails
+    """
+    return hashlib.sha256(token.encode("latin-1")).digest()
+
+
+def _cache_get(cache: dict, token_key: bytes):
+    """
+    Return a cached value for this token, or None if it was never cached
+    or has expired
+    """
+    entry = cache.get(token_key)
+    if entry is None:
+        return None
+
+    value, expires_at = entry
+    if time.time() >= expires_at:
+        cache.pop(token_key, None)
+        return None
+
+    return value
+
+
+def _cache_put(cache: dict, token_key: bytes, value, expires_at: float):
+    """
+    Cache a value until expires_at, evicting expired entries (then the
+    oldest) once the cache is full
+    """
+    now = time.time()
+    if expires_at <= now:
+        return
+
+    if len(cache) >= TOKEN_CACHE_MAX_SIZE:
+        for key in [k for k, (_, exp) in cache.items() if exp <= now]:
+            del cache[key]
+        if len(cache) >= TOKEN_CACHE_MAX_SIZE:
+            del cache[next(iter(cache))]
+
+    cache[token_key] = (value, expires_at)
+
+
+def _cache_payload(token_key: bytes, payload: dict):
+    """
+    Cache a verified payload until the token expires (capped at the cache TTL)
+    """
+    now = time.time()
+    expires_at = min(now + TOKEN_CACHE_TTL_SECONDS, payload.get("exp", now))
+    _cache_put(_token_cache, token_key, payload, expires_at)
+
+
+def _fast_header(token: str) -> dict:
+    """
+    Cheap structural check of a JWT before any key lookup or RSA work
+    Returns the decoded header, raising 401 for malformed tokens or headers
+    with an unexpected alg or no kid
+    """
+    parts = token.split(".")
+    if len(parts) != 3:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token: malformed token"
+        )
+
+    try:
+        header_segment = parts[0]
+        header = json.loads(base64.urlsafe_b64decode(header_segment + "=" * (-len(header_segment) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        header = None
+
+    if not isinstance(header, dict):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token: malformed header"
+        )
+
+    if header.get("alg") not in AUTH0_ALGORITHMS or not header.get("kid"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token: unsupported header"
+        )
+
+    return header
+
+
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """
     Verify the Auth0 JWT token
     Returns the decoded token payload if valid
     Raises HTTPException if invalid
     """
     token = credentials.credentials
+
+    # Tokens are immutable, so a previously verified token can skip RSA verification
+    token_key = _token_key(token)
+    cached_payload = _cache_get(_token_cache, token_key)
+    if cached_payload is not None:
+        return cached_payload
+
+    # Reject malformed tokens before touching the JWKS or RSA verification
+    unverified_header = _fast_header(token)
     
     try:
-        # Get the token header to find the key id (kid)
-        unverified_header = jwt.get_unverified_header(token)
-        
-        # Get the JWKS and find the right key
-        jwks = get_jwks()
-        rsa_key = {}
-        
-        for key in jwks["keys"]:
-            if key["kid"] == unverified_header["kid"]:
-                rsa_key = {
-                    "kty": key["kty"],
-                    "kid": key["kid"],
-                    "use": key["use"],
-                    "n": key["n"],
-                    "e": key["e"]
-                }
-                break
+        # Look up the prebuilt public key for this kid
+        kid = unverified_header["kid"]
+        public_key = (await get_public_keys()).get(kid)
+
+        if public_key is None:
+            # Auth0 may have rotated its signing keys since the last fetch
+            public_key = (await get_public_keys(force_refresh=True)).get(kid)
         
-        if not rsa_key:
+        if public_key is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Unable to find appropriate key"
             )
         
         # Verify the token
-        payload = jwt.decode(
-            token,
-            rsa_key,
-            algorithms=AUTH0_ALGORITHMS,
-            audience=AUTH0_API_AUDIENCE,
-            issuer=AUTH0_ISSUER
-        )
-        
+        payload = _decode_token(token, public_key)
+
+        _cache_payload(token_key, payload)
         return payload
         
-    except JWTError as e:
+    except InvalidTokenError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid token: {str(e)}"
@@ -90,12 +251,24 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security))
         )
 
 
-def get_current_user(token_payload: dict = Depends(verify_token)) -> dict:
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """
     Extract user information from the verified token
+    Repeat requests with the same bearer reuse the user built on the first hit
     """
-    return {
+    token_key = _token_key(credentials.credentials)
+    user = _cache_get(_user_cache, token_key)
+    if user is not None:
+        return user
+
+    token_payload = await verify_token(credentials)
+    user = {
         "sub": token_payload.get("sub"),
         "permissions": token_payload.get("permissions", []),
         "email": token_payload.get("email"),
-    }
\ No newline at end of file
+    }
+
+    # Never outlive the token itself
+    now = time.time()
+    _cache_put(_user_cache, token_key, user, min(now + USER_CACHE_TTL_SECONDS, token_payload.get("exp", now)))
+    return user
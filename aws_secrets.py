@@ -1,14 +1,35 @@
-import boto3
+import botocore.session
 import json
+from aws_secretsmanager_caching import SecretCache, SecretCacheConfig
 from botocore.exceptions import ClientError
 import os
 from functools import lru_cache
 
+# How long a cached secret is served before it is refreshed from Secrets Manager
+SECRET_REFRESH_INTERVAL_SECONDS = 3600
+
+
 @lru_cache(maxsize=1)
+def _get_secret_cache() -> SecretCache:
+    """
+    Create the Secrets Manager client and its secret cache once per process.
+    """
+    region_name = os.getenv("AWS_REGION", "us-east-1")
+
+    client = botocore.session.get_session().create_client(
+        service_name='secretsmanager',
+        region_name=region_name
+    )
+    config = SecretCacheConfig(secret_refresh_interval=SECRET_REFRESH_INTERVAL_SECONDS)
+    return SecretCache(config=config, client=client)
+
+
 def get_secret(secret_name: str) -> dict:
     """
     Retrieve a secret from AWS Secrets Manager.
-    Results are cached to minimize API calls.
+    Results are cached client-side and refreshed every
+    SECRET_REFRESH_INTERVAL_SECONDS, so rotated secrets are picked up
+    without a restart.
     
     Args:
         secret_name: The name or ARN of the secret in AWS Secrets Manager
@@ -19,27 +40,34 @@ def get_secret(secret_name: str) -> dict:
     Raises:
         ClientError: If the secret cannot be retrieved
     """
-    region_name = os.getenv("AWS_REGION", "us-east-1")
-    
-    # Create a Secrets Manager client
-    session = boto3.session.Session()
-    client = session.client(
-        service_name='secretsmanager',
-        region_name=region_name
-    )
-    
+    # For a list of exceptions thrown, see
+    # https://docs.aws.amazon.com/secretsmanager/latest/apireference/API_GetSecretValue.html
+    secret = _get_secret_cache().get_secret_string(secret_name)
+    return json.loads(secret)
+
+
+def _get_db_secret():
+    """
+    Database credentials from DB_SECRET_JSON when ECS injects them into the
+    container at task start, otherwise fetched by DB_SECRET_NAME.
+    Returns None when neither is set.
+    """
+    secret_json = os.getenv("DB_SECRET_JSON")
+    secret_name = os.getenv("DB_SECRET_NAME")
+    source = "DB_SECRET_JSON" if secret_json else "DB_SECRET_NAME"
+
     try:
-        get_secret_value_response = client.get_secret_value(
-            SecretId=secret_name
-        )
+        if secret_json:
+            return json.loads(secret_json)
+        if secret_name:
+            return get_secret(secret_name)
     except ClientError as e:
-        # For a list of exceptions thrown, see
-        # https://docs.aws.amazon.com/secretsmanager/latest/apireference/API_GetSecretValue.html
-        raise e
-    
-    # Decrypts secret using the associated KMS key.
-    secret = get_secret_value_response['SecretString']
-    return json.loads(secret)
+        print(f"Error retrieving secret from AWS Secrets Manager: {e}")
+        raise ValueError("Failed to retrieve database credentials from AWS Secrets Manager")
+    except json.JSONDecodeError:
+        raise ValueError(f"{source} is not valid JSON")
+
+    return None
 
 
 def get_database_url() -> str:
@@ -54,40 +82,50 @@ def get_database_url() -> str:
         "port": 5432,
         "dbname": "database_name"
     }
+
+    The secret is read from DB_SECRET_JSON when ECS injects it into the
+    container at task start, otherwise it is fetched by DB_SECRET_NAME.
     
     Returns:
         PostgreSQL connection string
     """
-    # Check if we should use AWS Secrets Manager
-    secret_name = os.getenv("DB_SECRET_NAME")
-    
-    if secret_name:
-        # Retrieve credentials from AWS Secrets Manager
-        try:
-            secret = get_secret(secret_name)
-            
-            username = secret.get("username")
-            password = secret.get("password")
-            host = secret.get("host")
-            port = secret.get("port", 5432)
-            dbname = secret.get("dbname")
-            
-            # Construct the database URL
-            database_url = f"postgresql://{username}:{password}@{host}:{port}/{dbname}"
-            
-            # Add SSL mode for production
-            if os.getenv("ENVIRONMENT") == "production":
-                database_url += "?sslmode=require"
-                
-            return database_url
-            
-        except ClientError as e:
-            print(f"Error retrieving secret from AWS Secrets Manager: {e}")
-            raise ValueError("Failed to retrieve database credentials from AWS Secrets Manager")
+    # Retrieve credentials injected by ECS, or from AWS Secrets Manager
+    secret = _get_db_secret()
+
+    if secret is not None:
+        username = secret.get("username")
+        password = secret.get("password")
+        host = secret.get("host")
+        port = secret.get("port", 5432)
+        dbname = secret.get("dbname")
+
+        # Construct the database URL
+        database_url = f"postgresql://{username}:{password}@{host}:{port}/{dbname}"
+
+        # Add SSL mode for production
+        if os.getenv("ENVIRONMENT") == "production":
+            database_url += "?sslmode=require"
+
+        return database_url
     
     # Fallback to environment variable for local development
     database_url = os.getenv("DATABASE_URL")
     if not database_url:
-        raise ValueError("Neither DB_SECRET_NAME nor DATABASE_URL is set")
+        raise ValueError("Neither DB_SECRET_JSON, DB_SECRET_NAME nor DATABASE_URL is set")
     
     return database_url
+
+
+def get_current_db_credentials():
+    """
+    Username and password for a new database connection, read through the secret
+    cache so a rotated DB_SECRET_NAME secret reaches new pool connections within
+    SECRET_REFRESH_INTERVAL_SECONDS.
+    Returns None when credentials don't come from Secrets Manager (DB_SECRET_JSON
+    is fixed for the life of the task, DATABASE_URL is for local development).
+    """
+    if os.getenv("DB_SECRET_JSON") or not os.getenv("DB_SECRET_NAME"):
+        return None
+
+    secret = _get_db_secret()
+    return {"user": secret.get("username"), "password": secret.get("password")}
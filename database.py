@@ -1,24 +1,51 @@
-from sqlalchemy import create_engine
+from botocore.exceptions import BotoCoreError
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
-from aws_secrets import get_database_url
+from aws_secrets import get_database_url, get_current_db_credentials
 
 load_dotenv()
 
 # Get database URL from AWS Secrets Manager or environment variables
 DATABASE_URL = get_database_url()
 
+# Connection pool sizing; POOL_CAPACITY is the most connections checked out at once.
+# Keep POOL_CAPACITY x task count under the RDS max_connections limit.
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))
+POOL_CAPACITY = POOL_SIZE + MAX_OVERFLOW
+
 # Create SQLAlchemy engine
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,  # Enable connection health checks
-    pool_size=10,  # Connection pool size
-    max_overflow=20,  # Max connections beyond pool_size
+    pool_size=POOL_SIZE,  # Connection pool size
+    max_overflow=MAX_OVERFLOW,  # Max connections beyond pool_size
+    pool_recycle=1800,  # Replace connections before RDS/NAT idle timeouts drop them
+    pool_timeout=POOL_TIMEOUT,  # Fail fast instead of queueing when the pool is exhausted
     echo=False  # Set to True for SQL query logging during development
 )
 
+
+@event.listens_for(engine, "do_connect")
+def use_current_db_credentials(dialect, conn_rec, cargs, cparams):
+    """
+    Connect with the latest cached credentials rather than the ones baked into
+    DATABASE_URL at import, so new connections follow a rotated secret.
+    If Secrets Manager can't be reached, fall back to the URL's credentials.
+    """
+    try:
+        credentials = get_current_db_credentials()
+    except (ValueError, BotoCoreError) as e:
+        print(f"Using startup database credentials: {e}")
+        return
+    if credentials:
+        cparams.update(credentials)
+
+
 # Create SessionLocal class for database sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
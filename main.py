@@ -1,29 +1,72 @@
+import base64
+import binascii
 import json
 import os
+import sys
 import calendar
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime, timedelta, timezone, date as date_type
+from itertools import islice
 from typing import List, Optional
 
+import anyio
 import boto3
-from fastapi import FastAPI, Depends, HTTPException, status, Query
+import orjson
+from fastapi import FastAPI, Depends, HTTPException, status, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session, joinedload
-
-from auth import get_current_user
-from database import get_db
+from fastapi.responses import ORJSONResponse
+from psycopg2.errorcodes import FOREIGN_KEY_VIOLATION, UNIQUE_VIOLATION
+from sqlalchemy import func, insert, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from auth import get_current_user, close_jwks_client
+from database import get_db, SessionLocal, POOL_CAPACITY
 from models import Transaction, RefreshMetadata, ConnalaideCategory, PayPeriod, ProjectedExpense, RecurringExpense
 from schemas import (
     TransactionResponse, RefreshStatusResponse, RefreshResponse, TransactionUpdateRequest,
+    TRANSACTION_ADAPTER, CATEGORY_LIST_ADAPTER, CATEGORY_ADAPTER,
+    PAY_PERIOD_LIST_ADAPTER, PAY_PERIOD_ADAPTER, PROJECTED_EXPENSE_LIST_ADAPTER, RECURRING_EXPENSE_LIST_ADAPTER,
     ConnalaideCategoryCreate, ConnalaideCategoryUpdate, ConnalaideCategoryResponse,
     PayPeriodCreate, PayPeriodUpdate, PayPeriodResponse,
     ProjectedExpenseCreate, ProjectedExpenseUpdate, ProjectedExpenseResponse,
     RecurringExpenseCreate, RecurringExpenseUpdate, RecurringExpenseResponse
 )
 
+# Created once so the botocore service model and HTTPS connections are reused across refreshes
+lambda_client = boto3.client(
+    "lambda",
+    region_name=os.getenv("AWS_REGION", "us-east-1")
+)
+PLAID_FETCHER_FUNCTION_NAME = "plaid-fetcher-v2-production"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown hooks for the application"""
+    # DB handlers run in the threadpool; size it to the connection pool so excess
+    # requests wait for a thread rather than time out waiting for a connection
+    anyio.to_thread.current_default_thread_limiter().total_tokens = POOL_CAPACITY
+
+    # Build the OpenAPI schema up front so the first /docs request doesn't pay for it
+    app.openapi()
+
+    # Load categories in the background so startup (and the health check) never
+    # waits on the database; until then the first request loads them itself
+    threading.Thread(target=warm_category_cache, name="warm-category-cache", daemon=True).start()
+    yield
+    # Release the pooled Auth0 connection used for JWKS fetches
+    await close_jwks_client()
+
+
 app = FastAPI(
     title="Connelaide API",
     description="Backend API for Connelaide",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -34,8 +77,10 @@ app.add_middleware(
         "http://localhost:4200"  # For local development
     ],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PATCH", "DELETE"],
+    allow_headers=["Authorization", "Content-Type", "If-None-Match"],
+    expose_headers=["X-Next-Cursor"],
+    max_age=86400,  # Let browsers cache preflight responses for a day
 )
 
 @app.get("/")
@@ -62,45 +107,176 @@ async def protected_endpoint(current_user: dict = Depends(get_current_user)):
     }
 
 @app.get("/api/v1/user/profile")
-async def get_user_profile(
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
+async def get_user_profile(current_user: dict = Depends(get_current_user)):
     """Get the current user's profile"""
     return {
         "profile": current_user,
         "message": "Successfully retrieved user profile"
     }
 
-@app.get("/api/v1/transactions", response_model=List[TransactionResponse])
-async def get_transactions(
-    start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
-    end_date: str = Query(..., description="End date (YYYY-MM-DD)"),
+def model_columns(model, *exclude) -> list:
+    """Mapped columns of a model, for list queries that skip ORM object loading"""
+    return [attr.class_attribute for attr in model.__mapper__.column_attrs if attr.key not in exclude]
+
+
+# List endpoints select these plus the category name, which is resolved in SQL
+PROJECTED_EXPENSE_LIST_COLUMNS = model_columns(ProjectedExpense)
+RECURRING_EXPENSE_LIST_COLUMNS = model_columns(RecurringExpense)
+
+# The transactions list selects one column per TransactionResponse field, labelled
+# and ordered like the response, so each row zips straight onto the response keys
+TRANSACTION_RESPONSE_FIELDS = tuple(TransactionResponse.model_fields)
+TRANSACTION_LIST_COLUMNS = [
+    (
+        ConnalaideCategory.name if field == "connelaide_category"
+        else getattr(Transaction, info.validation_alias or field)
+    ).label(field)
+    for field, info in TransactionResponse.model_fields.items()
+]
+
+# Rows fetched from the server-side cursor and serialized per batch on unpaged transaction reads
+TRANSACTION_LIST_BATCH_SIZE = 500
+
+
+def render_transaction_list(rows) -> bytes:
+    """
+    Encode transaction rows as a JSON array, TRANSACTION_LIST_BATCH_SIZE rows at a time,
+    so only one batch of row dicts is alive at once.
+    Rows come from TRANSACTION_LIST_COLUMNS and already hold exactly the response
+    fields as JSON-native values, so orjson encodes them without a pydantic pass.
+    OPT_UTC_Z writes UTC timestamps with a Z suffix, as pydantic does.
+    """
+    rows = iter(rows)
+    chunks = []
+    while batch := list(islice(rows, TRANSACTION_LIST_BATCH_SIZE)):
+        encoded = orjson.dumps(
+            [dict(zip(TRANSACTION_RESPONSE_FIELDS, row)) for row in batch],
+            option=orjson.OPT_UTC_Z
+        )
+        chunks.append(encoded[1:-1])  # strip the batch's own brackets
+    return b"[" + b",".join(chunks) + b"]"
+
+
+def json_response(adapter, value) -> Response:
+    """
+    Encode trusted rows, row dicts or ORM objects with a prebuilt TypeAdapter.
+    Used instead of response_model, which would validate the value, dump it to
+    Python objects and only then encode them.
+    """
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(value, from_attributes=True)),
+        media_type="application/json"
+    )
+
+
+def patch_row(db: Session, model, row_id: int, values: dict):
+    """
+    Apply a PATCH as a single UPDATE ... RETURNING and return the updated row,
+    or None if no row has this id. An empty PATCH just reads the row back.
+    Models with a category FK also get the category name, joined in the same statement.
+    """
+    columns = model_columns(model)
+    if values:
+        patched = update(model).where(model.id == row_id).values(**values).returning(*columns).cte("patched")
+    else:
+        patched = select(*columns).where(model.id == row_id).cte("patched")
+
+    if "connelaide_category_id" not in patched.c:
+        return db.execute(select(patched)).first()
+
+    return db.execute(
+        select(
+            patched,
+            ConnalaideCategory.name.label("connelaide_category")
+        ).outerjoin(ConnalaideCategory, patched.c.connelaide_category_id == ConnalaideCategory.id)
+    ).first()
+
+
+def encode_transaction_cursor(transaction) -> str:
+    """Opaque keyset cursor pointing just past this transaction in list order"""
+    raw = json.dumps([transaction.date.isoformat(), transaction.transaction_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_transaction_cursor(cursor: str) -> tuple:
+    """Decode a cursor from encode_transaction_cursor into (date, transaction_id)"""
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        # Anything but [date string, transaction_id string] would reach the SQL comparison
+        if not (isinstance(decoded, list) and len(decoded) == 2 and all(isinstance(v, str) for v in decoded)):
+            raise ValueError("malformed cursor")
+        cursor_date, cursor_transaction_id = decoded
+        cursor_date = date_type.fromisoformat(cursor_date)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return cursor_date, cursor_transaction_id
+
+
+@app.get(
+    "/api/v1/transactions",
+    response_model=None,
+    responses={200: {"model": List[TransactionResponse]}}
+)
+def get_transactions(
+    start_date: date_type = Query(..., description="Start date (YYYY-MM-DD)"),
+    end_date: date_type = Query(..., description="End date (YYYY-MM-DD)"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of transactions to return"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get transactions within a date range (inclusive)"""
-    transactions = db.query(Transaction)\
-        .options(joinedload(Transaction.category))\
+    """
+    Get transactions within a date range (inclusive), newest first.
+    When limit is given and more rows remain, the X-Next-Cursor response
+    header holds the cursor for the next page.
+    """
+    query = db.query(*TRANSACTION_LIST_COLUMNS)\
+        .outerjoin(ConnalaideCategory, Transaction.connelaide_category_id == ConnalaideCategory.id)\
         .filter(Transaction.date >= start_date)\
-        .filter(Transaction.date <= end_date)\
-        .order_by(Transaction.date.desc(), Transaction.transaction_id.desc())\
-        .all()
+        .filter(Transaction.date <= end_date)
+
+    if cursor:
+        # Keyset pagination: continue strictly after the last row of the previous page
+        query = query.filter(
+            tuple_(Transaction.date, Transaction.transaction_id) < decode_transaction_cursor(cursor)
+        )
 
-    # Populate connelaide_category name from the relationship for response serialization
-    for t in transactions:
-        if t.category:
-            t.connelaide_category = t.category.name
+    query = query.order_by(Transaction.date.desc(), Transaction.transaction_id.desc())
 
-    return transactions
+    headers = {}
+    if limit is None:
+        # Stream wide date ranges from a server-side cursor instead of loading every row up front
+        transactions = query.yield_per(TRANSACTION_LIST_BATCH_SIZE)
+    else:
+        # Fetch one extra row to learn whether another page exists
+        transactions = query.limit(limit + 1).all()
+        if len(transactions) > limit:
+            transactions = transactions[:limit]
+            headers["X-Next-Cursor"] = encode_transaction_cursor(transactions[-1])
+
+    # Serialize directly rather than through response_model, which would validate
+    # every row and dump it to Python objects before encoding
+    return Response(
+        content=render_transaction_list(transactions),
+        media_type="application/json",
+        headers=headers
+    )
 
-@app.get("/api/v1/transactions/first", response_model=TransactionResponse)
-async def get_first_transaction(
+@app.get(
+    "/api/v1/transactions/first",
+    response_model=None,
+    responses={200: {"model": TransactionResponse}}
+)
+def get_first_transaction(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get the first transaction from the database - Protected endpoint"""
-    transaction = db.query(Transaction).first()
+    transaction = db.execute(
+        select(*model_columns(Transaction), ConnalaideCategory.name.label("connelaide_category"))
+        .outerjoin(ConnalaideCategory, Transaction.connelaide_category_id == ConnalaideCategory.id)
+        .limit(1)
+    ).first()
 
     if not transaction:
         raise HTTPException(
@@ -108,41 +284,90 @@ async def get_first_transaction(
             detail="No transactions found"
         )
 
-    return transaction
+    return json_response(TRANSACTION_ADAPTER, transaction)
 
 
-@app.get("/api/v1/transactions/refresh-status", response_model=RefreshStatusResponse)
-async def get_refresh_status(
+@app.get(
+    "/api/v1/transactions/refresh-status",
+    response_model=None,
+    responses={200: {"model": RefreshStatusResponse}}
+)
+def get_refresh_status(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get the last refresh timestamp for transactions"""
+    """
+    Get the last completed refresh for transactions, plus when the last background
+    refresh was queued. A background refresh doesn't move last_refreshed_at.
+    """
     metadata = db.query(RefreshMetadata).filter(
         RefreshMetadata.key == "plaid_transactions"
     ).first()
 
+    if not metadata:
+        return RefreshStatusResponse()
+
     return RefreshStatusResponse(
-        last_refreshed_at=metadata.last_refreshed_at if metadata else None
+        last_refreshed_at=metadata.last_refreshed_at,
+        refresh_requested_at=metadata.refresh_requested_at,
+        refresh_job_id=metadata.refresh_job_id
+    )
+
+
+def record_refresh(db: Session, refreshed_at: datetime):
+    """
+    Store the refresh timestamp in a single upsert, creating the metadata row on
+    first refresh. Concurrent first refreshes can't race into a duplicate key.
+    """
+    stmt = pg_insert(RefreshMetadata).values(key="plaid_transactions", last_refreshed_at=refreshed_at)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[RefreshMetadata.key],
+        set_={"last_refreshed_at": stmt.excluded.last_refreshed_at, "updated_at": func.now()}
+    ))
+    db.commit()
+
+
+def record_refresh_request(db: Session, requested_at: datetime, job_id: str):
+    """
+    Note a queued background refresh without touching last_refreshed_at, so a
+    run that fails in the background doesn't advance the fetch window.
+    """
+    stmt = pg_insert(RefreshMetadata).values(
+        key="plaid_transactions", refresh_requested_at=requested_at, refresh_job_id=job_id
     )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[RefreshMetadata.key],
+        set_={
+            "refresh_requested_at": stmt.excluded.refresh_requested_at,
+            "refresh_job_id": stmt.excluded.refresh_job_id,
+            "updated_at": func.now()
+        }
+    ))
+    db.commit()
 
 
 @app.post("/api/v1/transactions/refresh", response_model=RefreshResponse)
-async def refresh_transactions(
+def refresh_transactions(
+    http_response: Response,
+    wait: bool = Query(True, description="Wait for the fetch to finish; when false the Lambda runs in the background and 202 is returned. /refresh-status then reports the queued job_id, not its completion"),
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Invoke Lambda to fetch new transactions from Plaid"""
     # Get last refresh date
-    metadata = db.query(RefreshMetadata).filter(
+    last_refreshed_at = db.query(RefreshMetadata.last_refreshed_at).filter(
         RefreshMetadata.key == "plaid_transactions"
-    ).first()
+    ).scalar()
+
+    # Return the connection to the pool rather than holding it across the Lambda call
+    db.close()
 
     now = datetime.now(timezone.utc)
 
-    if metadata and metadata.last_refreshed_at:
+    if last_refreshed_at:
         # Start from 14 days before last refresh to catch late-clearing pending transactions,
         # backfilled transactions, and date corrections from Plaid
-        start_date = (metadata.last_refreshed_at - timedelta(days=14)).strftime("%Y-%m-%d")
+        start_date = (last_refreshed_at - timedelta(days=14)).strftime("%Y-%m-%d")
     else:
         # First refresh: go back 30 days
         start_date = (now - timedelta(days=30)).strftime("%Y-%m-%d")
@@ -151,24 +376,38 @@ async def refresh_transactions(
 
     # Invoke Lambda
     try:
-        lambda_client = boto3.client(
-            "lambda",
-            region_name=os.getenv("AWS_REGION", "us-east-1")
-        )
-
         payload = {
             "start_date": start_date,
             "end_date": end_date
         }
 
+        if not wait:
+            # Queue the fetch and return immediately instead of holding this worker for the Plaid round trip
+            response = lambda_client.invoke(
+                FunctionName=PLAID_FETCHER_FUNCTION_NAME,
+                InvocationType="Event",
+                Payload=orjson.dumps(payload)
+            )
+
+            job_id = response["ResponseMetadata"]["RequestId"]
+            record_refresh_request(db, now, job_id)
+
+            http_response.status_code = status.HTTP_202_ACCEPTED
+            return RefreshResponse(
+                success=True,
+                message="Refresh started",
+                job_id=job_id,
+                last_refreshed_at=last_refreshed_at
+            )
+
         response = lambda_client.invoke(
-            FunctionName="plaid-fetcher-v2-production",
+            FunctionName=PLAID_FETCHER_FUNCTION_NAME,
             InvocationType="RequestResponse",
-            Payload=json.dumps(payload)
+            Payload=orjson.dumps(payload)
         )
 
-        # Parse Lambda response
-        response_payload = json.loads(response["Payload"].read().decode("utf-8"))
+        # Parse Lambda response; orjson parses the payload bytes without decoding to str first
+        response_payload = orjson.loads(response["Payload"].read())
 
         if response.get("FunctionError"):
             return RefreshResponse(
@@ -176,24 +415,16 @@ async def refresh_transactions(
                 message=f"Lambda error: {response_payload.get('errorMessage', 'Unknown error')}"
             )
 
-        # Check if Lambda returned a body (API Gateway format)
-        if "body" in response_payload:
-            body = json.loads(response_payload["body"]) if isinstance(response_payload["body"], str) else response_payload["body"]
+        # Read the flat form first; only parse the API Gateway body when the count isn't at the top level
+        transactions_count = response_payload.get("transactions_count")
+        if transactions_count is None:
+            body = response_payload.get("body") or {}
+            if isinstance(body, str):
+                body = orjson.loads(body)
             transactions_count = body.get("transactions_count", 0)
-        else:
-            transactions_count = response_payload.get("transactions_count", 0)
 
         # Update refresh metadata
-        if metadata:
-            metadata.last_refreshed_at = now
-        else:
-            metadata = RefreshMetadata(
-                key="plaid_transactions",
-                last_refreshed_at=now
-            )
-            db.add(metadata)
-
-        db.commit()
+        record_refresh(db, now)
 
         return RefreshResponse(
             success=True,
@@ -209,59 +440,191 @@ async def refresh_transactions(
         )
 
 
-@app.patch("/api/v1/transactions/{transaction_id}", response_model=TransactionResponse)
-async def update_transaction(
+@app.patch(
+    "/api/v1/transactions/{transaction_id}",
+    response_model=None,
+    responses={200: {"model": TransactionResponse}}
+)
+def update_transaction(
     transaction_id: int,
     updates: TransactionUpdateRequest,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update user-editable fields on a transaction"""
-    transaction = db.query(Transaction)\
-        .options(joinedload(Transaction.category))\
-        .filter(Transaction.id == transaction_id).first()
-    if not transaction:
-        raise HTTPException(status_code=404, detail="Transaction not found")
-
     update_data = updates.model_dump(exclude_unset=True)
 
     # Validate category_id if provided
     if 'connelaide_category_id' in update_data and update_data['connelaide_category_id'] is not None:
-        category = db.query(ConnalaideCategory).filter(
-            ConnalaideCategory.id == update_data['connelaide_category_id']
-        ).first()
-        if not category:
-            raise HTTPException(status_code=400, detail="Category not found")
-
-    for field, value in update_data.items():
-        setattr(transaction, field, value)
+        ensure_category_exists(db, update_data['connelaide_category_id'])
 
-    db.commit()
-    db.refresh(transaction)
+    with category_write_guard(db):
+        transaction = patch_row(db, Transaction, transaction_id, update_data)
+        db.commit()
 
-    # Populate connelaide_category name from the relationship for response
-    if transaction.category:
-        transaction.connelaide_category = transaction.category.name
+    if not transaction:
+        raise HTTPException(status_code=404, detail="Transaction not found")
 
-    return transaction
+    return json_response(TRANSACTION_ADAPTER, transaction)
 
 
 # ============================================
 # Connelaide Categories Endpoints
 # ============================================
 
-@app.get("/api/v1/connalaide-categories", response_model=List[ConnalaideCategoryResponse])
-async def get_categories(
+# In-process snapshot of the category list. Category writes on this instance
+# invalidate it; the TTL bounds staleness against writes made elsewhere.
+CATEGORY_CACHE_TTL_SECONDS = 60
+_category_cache = {"snapshot": None, "expires_at": 0.0, "generation": 0}
+
+
+def invalidate_category_cache():
+    """Drop the cached category snapshot after a category write"""
+    _category_cache["generation"] += 1
+    _category_cache["expires_at"] = 0.0
+
+
+def get_cached_categories(db: Session) -> dict:
+    """
+    Return the category snapshot: the name-ordered list, an id -> name map,
+    and a weak ETag for the list. Reloads from the database when expired.
+    """
+    if time.monotonic() < _category_cache["expires_at"]:
+        return _category_cache["snapshot"]
+
+    generation = _category_cache["generation"]
+    categories = [
+        ConnalaideCategoryResponse.model_validate(category)
+        for category in db.query(ConnalaideCategory).order_by(ConnalaideCategory.name).all()
+    ]
+
+    # Creates bump the max id, deletes change the count, and edits bump the latest updated_at
+    max_id = max((c.id for c in categories), default=0)
+    last_modified = max((c.updated_at or c.created_at for c in categories), default=None)
+    last_modified_ts = last_modified.timestamp() if last_modified else 0
+
+    snapshot = {
+        # The list is encoded once per load, so GETs just send the cached bytes
+        "body": CATEGORY_LIST_ADAPTER.dump_json(categories),
+        # Interned so every response naming a category shares one string
+        "names": {c.id: sys.intern(c.name) for c in categories},
+        "etag": f'W/"{len(categories)}-{max_id}-{last_modified_ts}"',
+    }
+
+    # Skip storing if a write invalidated the cache while we were loading
+    if generation == _category_cache["generation"]:
+        _category_cache["snapshot"] = snapshot
+        _category_cache["expires_at"] = time.monotonic() + CATEGORY_CACHE_TTL_SECONDS
+
+    return snapshot
+
+
+def warm_category_cache():
+    """
+    Load the category snapshot before the first request needs it. If the database
+    isn't reachable yet the cache just stays cold.
+    """
+    db = SessionLocal()
+    try:
+        get_cached_categories(db)
+    except SQLAlchemyError:
+        pass
+    finally:
+        db.close()
+
+
+def ensure_category_exists(db: Session, category_id: int):
+    """Raise 400 if the category does not exist, checking the cached id map first"""
+    if category_id in get_cached_categories(db)["names"]:
+        return
+
+    # The category may have been created on another instance since the last load
+    invalidate_category_cache()
+    if category_id not in get_cached_categories(db)["names"]:
+        raise HTTPException(status_code=400, detail="Category not found")
+
+
+@contextmanager
+def category_write_guard(db: Session):
+    """
+    Turn a category FK violation into 400 "Category not found". The cached id map
+    can still hold a category deleted elsewhere (another task, a script) since
+    the last load, so ensure_category_exists may pass a stale id.
+    """
+    try:
+        yield
+    except IntegrityError as e:
+        db.rollback()
+        diag = getattr(e.orig, "diag", None)
+        is_category_fk = (
+            getattr(e.orig, "pgcode", None) == FOREIGN_KEY_VIOLATION
+            and diag is not None
+            and '"connalaide_categories"' in (diag.message_detail or "")
+        )
+        if not is_category_fk:
+            raise
+        invalidate_category_cache()
+        raise HTTPException(status_code=400, detail="Category not found")
+
+
+@contextmanager
+def category_name_guard(db: Session):
+    """
+    Turn a duplicate category name into a 400 Bad Request. The unique index on
+    name rejects duplicates without a separate lookup; any other integrity
+    error is re-raised.
+    """
+    try:
+        yield
+    except IntegrityError as e:
+        db.rollback()
+        diag = getattr(e.orig, "diag", None)
+        is_duplicate_name = (
+            getattr(e.orig, "pgcode", None) == UNIQUE_VIOLATION
+            and diag is not None
+            and diag.constraint_name == "ix_connalaide_categories_name"
+        )
+        if not is_duplicate_name:
+            raise
+        raise HTTPException(status_code=400, detail="Category with this name already exists")
+
+
+def get_category_name(db: Session, category_id: Optional[int]) -> Optional[str]:
+    """Look up a category's name in the cached id map"""
+    if category_id is None:
+        return None
+    return get_cached_categories(db)["names"].get(category_id)
+
+
+@app.get(
+    "/api/v1/connalaide-categories",
+    response_model=None,
+    responses={200: {"model": List[ConnalaideCategoryResponse]}}
+)
+def get_categories(
+    request: Request,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all Connelaide categories"""
-    categories = db.query(ConnalaideCategory).order_by(ConnalaideCategory.name).all()
-    return categories
+    """Get all Connelaide categories. Supports conditional GET via If-None-Match."""
+    snapshot = get_cached_categories(db)
+    etag = snapshot["etag"]
+    # Clients may cache the list but must revalidate, which is a cheap 304 when unchanged
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+
+    return Response(content=snapshot["body"], media_type="application/json", headers=cache_headers)
 
 
-@app.get("/api/v1/connalaide-categories/{category_id}", response_model=ConnalaideCategoryResponse)
-async def get_category(
+@app.get(
+    "/api/v1/connalaide-categories/{category_id}",
+    response_model=None,
+    responses={200: {"model": ConnalaideCategoryResponse}}
+)
+def get_category(
     category_id: int,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -270,61 +633,50 @@ async def get_category(
     category = db.query(ConnalaideCategory).filter(ConnalaideCategory.id == category_id).first()
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
-    return category
+    return json_response(CATEGORY_ADAPTER, category)
 
 
 @app.post("/api/v1/connalaide-categories", response_model=ConnalaideCategoryResponse, status_code=status.HTTP_201_CREATED)
-async def create_category(
+def create_category(
     category_data: ConnalaideCategoryCreate,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new category"""
-    # Check if category with same name exists
-    existing = db.query(ConnalaideCategory).filter(ConnalaideCategory.name == category_data.name).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Category with this name already exists")
-
     category = ConnalaideCategory(name=category_data.name)
     db.add(category)
-    db.commit()
+
+    with category_name_guard(db):
+        db.commit()
+
+    invalidate_category_cache()
     db.refresh(category)
     return category
 
 
 @app.patch("/api/v1/connalaide-categories/{category_id}", response_model=ConnalaideCategoryResponse)
-async def update_category(
+def update_category(
     category_id: int,
     updates: ConnalaideCategoryUpdate,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update a category"""
-    category = db.query(ConnalaideCategory).filter(ConnalaideCategory.id == category_id).first()
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
-
     update_data = updates.model_dump(exclude_unset=True)
 
-    # Check for duplicate name if name is being updated
-    if "name" in update_data:
-        existing = db.query(ConnalaideCategory).filter(
-            ConnalaideCategory.name == update_data["name"],
-            ConnalaideCategory.id != category_id
-        ).first()
-        if existing:
-            raise HTTPException(status_code=400, detail="Category with this name already exists")
+    with category_name_guard(db):
+        category = patch_row(db, ConnalaideCategory, category_id, update_data)
+        db.commit()
 
-    for field, value in update_data.items():
-        setattr(category, field, value)
+    if not category:
+        raise HTTPException(status_code=404, detail="Category not found")
 
-    db.commit()
-    db.refresh(category)
+    invalidate_category_cache()
     return category
 
 
 @app.delete("/api/v1/connalaide-categories/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_category(
+def delete_category(
     category_id: int,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -334,13 +686,15 @@ async def delete_category(
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
 
-    # Null out connelaide_category_id on any transactions using this category
+    # Null out connelaide_category_id on any transactions using this category.
+    # No transactions are loaded in this session, so skip syncing in-memory objects.
     db.query(Transaction).filter(
         Transaction.connelaide_category_id == category_id
-    ).update({"connelaide_category_id": None})
+    ).update({"connelaide_category_id": None}, synchronize_session=False)
 
     db.delete(category)
     db.commit()
+    invalidate_category_cache()
     return None
 
 
@@ -348,28 +702,34 @@ async def delete_category(
 # Pay Periods Endpoints
 # ============================================
 
-def validate_pay_period_dates(start_date: str, end_date: str):
-    """Validate that dates are valid YYYY-MM-DD format and end >= start"""
+def parse_ymd(value: str) -> date_type:
+    """Parse a YYYY-MM-DD date, raising 400 if it is malformed"""
+    # fromisoformat also accepts forms like 20240101 and 2024-W01-1, so pin the shape first
+    if not isinstance(value, str) or len(value) != 10 or value[4] != "-" or value[7] != "-":
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
     try:
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        end = datetime.strptime(end_date, "%Y-%m-%d")
+        return date_type.fromisoformat(value)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
 
-    if end < start:
+
+def validate_pay_period_dates(start_date: date_type, end_date: date_type):
+    """Validate that end >= start"""
+    if end_date < start_date:
         raise HTTPException(status_code=400, detail="End date must be >= start date")
 
 
-def check_pay_period_overlap(db: Session, start_date: str, end_date: str, exclude_id: Optional[int] = None):
+def check_pay_period_overlap(db: Session, start_date: date_type, end_date: date_type, exclude_id: Optional[int] = None):
     """Check if the date range overlaps with any existing pay period"""
-    query = db.query(PayPeriod).filter(
+    # Only the two dates are needed for the error message, so skip loading the full row
+    query = select(PayPeriod.start_date, PayPeriod.end_date).where(
         PayPeriod.start_date <= end_date,
         PayPeriod.end_date >= start_date
     )
     if exclude_id:
-        query = query.filter(PayPeriod.id != exclude_id)
+        query = query.where(PayPeriod.id != exclude_id)
 
-    overlapping = query.first()
+    overlapping = db.execute(query.limit(1)).first()
     if overlapping:
         raise HTTPException(
             status_code=400,
@@ -377,18 +737,26 @@ def check_pay_period_overlap(db: Session, start_date: str, end_date: str, exclud
         )
 
 
-@app.get("/api/v1/pay-periods", response_model=List[PayPeriodResponse])
-async def get_pay_periods(
+@app.get(
+    "/api/v1/pay-periods",
+    response_model=None,
+    responses={200: {"model": List[PayPeriodResponse]}}
+)
+def get_pay_periods(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get all pay periods ordered by start_date descending"""
     pay_periods = db.query(PayPeriod).order_by(PayPeriod.start_date.desc()).all()
-    return pay_periods
+    return json_response(PAY_PERIOD_LIST_ADAPTER, pay_periods)
 
 
-@app.get("/api/v1/pay-periods/{pay_period_id}", response_model=PayPeriodResponse)
-async def get_pay_period(
+@app.get(
+    "/api/v1/pay-periods/{pay_period_id}",
+    response_model=None,
+    responses={200: {"model": PayPeriodResponse}}
+)
+def get_pay_period(
     pay_period_id: int,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -397,22 +765,24 @@ async def get_pay_period(
     pay_period = db.query(PayPeriod).filter(PayPeriod.id == pay_period_id).first()
     if not pay_period:
         raise HTTPException(status_code=404, detail="Pay period not found")
-    return pay_period
+    return json_response(PAY_PERIOD_ADAPTER, pay_period)
 
 
 @app.post("/api/v1/pay-periods", response_model=PayPeriodResponse, status_code=status.HTTP_201_CREATED)
-async def create_pay_period(
+def create_pay_period(
     pay_period_data: PayPeriodCreate,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new pay period"""
-    validate_pay_period_dates(pay_period_data.start_date, pay_period_data.end_date)
-    check_pay_period_overlap(db, pay_period_data.start_date, pay_period_data.end_date)
+    start_date = parse_ymd(pay_period_data.start_date)
+    end_date = parse_ymd(pay_period_data.end_date)
+    validate_pay_period_dates(start_date, end_date)
+    check_pay_period_overlap(db, start_date, end_date)
 
     pay_period = PayPeriod(
-        start_date=pay_period_data.start_date,
-        end_date=pay_period_data.end_date,
+        start_date=start_date,
+        end_date=end_date,
         checking_budget=pay_period_data.checking_budget
     )
     db.add(pay_period)
@@ -422,38 +792,44 @@ async def create_pay_period(
 
 
 @app.patch("/api/v1/pay-periods/{pay_period_id}", response_model=PayPeriodResponse)
-async def update_pay_period(
+def update_pay_period(
     pay_period_id: int,
     updates: PayPeriodUpdate,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update a pay period"""
-    pay_period = db.query(PayPeriod).filter(PayPeriod.id == pay_period_id).first()
-    if not pay_period:
-        raise HTTPException(status_code=404, detail="Pay period not found")
-
     update_data = updates.model_dump(exclude_unset=True)
 
-    # Get final start_date and end_date for validation
-    new_start = update_data.get("start_date", pay_period.start_date)
-    new_end = update_data.get("end_date", pay_period.end_date)
-
     # Validate dates if either is being updated
     if "start_date" in update_data or "end_date" in update_data:
+        current = db.execute(
+            select(PayPeriod.start_date, PayPeriod.end_date).where(PayPeriod.id == pay_period_id)
+        ).first()
+        if not current:
+            raise HTTPException(status_code=404, detail="Pay period not found")
+
+        for field in ("start_date", "end_date"):
+            if field in update_data:
+                update_data[field] = parse_ymd(update_data[field])
+
+        # Get final start_date and end_date for validation
+        new_start = update_data.get("start_date", current.start_date)
+        new_end = update_data.get("end_date", current.end_date)
+
         validate_pay_period_dates(new_start, new_end)
         check_pay_period_overlap(db, new_start, new_end, exclude_id=pay_period_id)
 
-    for field, value in update_data.items():
-        setattr(pay_period, field, value)
+    pay_period = patch_row(db, PayPeriod, pay_period_id, update_data)
+    if not pay_period:
+        raise HTTPException(status_code=404, detail="Pay period not found")
 
     db.commit()
-    db.refresh(pay_period)
     return pay_period
 
 
 @app.delete("/api/v1/pay-periods/{pay_period_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_pay_period(
+def delete_pay_period(
     pay_period_id: int,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -472,17 +848,15 @@ async def delete_pay_period(
 # Recurring Expense Generation Helpers
 # ============================================
 
-def compute_occurrence_dates(recurring, range_start: str, range_end: str) -> list:
-    """Compute YYYY-MM-DD dates where this recurring expense occurs within range."""
-    r_start = max(recurring.start_date, range_start)
-    r_end = range_end
+def compute_occurrence_dates(recurring, range_start: date_type, range_end: date_type) -> list:
+    """Compute the dates where this recurring expense occurs within range."""
+    start = max(recurring.start_date, range_start)
+    end = range_end
     if recurring.end_date:
-        r_end = min(recurring.end_date, range_end)
-    if r_start > r_end:
+        end = min(recurring.end_date, range_end)
+    if start > end:
         return []
 
-    start = datetime.strptime(r_start, "%Y-%m-%d").date()
-    end = datetime.strptime(r_end, "%Y-%m-%d").date()
     dates = []
 
     if recurring.frequency == 'monthly':
@@ -494,7 +868,7 @@ def compute_occurrence_dates(recurring, range_start: str, range_end: str) -> lis
             if occ > end:
                 break
             if occ >= start:
-                dates.append(occ.strftime("%Y-%m-%d"))
+                dates.append(occ)
             if current_month == 12:
                 current_month = 1
                 current_year += 1
@@ -512,12 +886,12 @@ def compute_occurrence_dates(recurring, range_start: str, range_end: str) -> lis
                 except ValueError:
                     continue
                 if start <= occ <= end:
-                    dates.append(occ.strftime("%Y-%m-%d"))
+                    dates.append(occ)
 
     return dates
 
 
-def generate_recurring_projected_expenses(db: Session, start_date: str, end_date: str):
+def generate_recurring_projected_expenses(db: Session, start_date: date_type, end_date: date_type):
     """Auto-create ProjectedExpense records for recurring expenses in the date range."""
     recurring_expenses = db.query(RecurringExpense).filter(
         RecurringExpense.is_active == True,
@@ -528,31 +902,46 @@ def generate_recurring_projected_expenses(db: Session, start_date: str, end_date
         if re.end_date is None or re.end_date >= start_date
     ]
 
-    for recurring in recurring_expenses:
-        occurrence_dates = compute_occurrence_dates(recurring, start_date, end_date)
-        if not occurrence_dates:
-            continue
-
-        existing_dates = set(
-            row[0] for row in db.query(ProjectedExpense.date).filter(
-                ProjectedExpense.recurring_expense_id == recurring.id,
-                ProjectedExpense.date >= start_date,
-                ProjectedExpense.date <= end_date
-            ).all()
-        )
-
-        for occ_date in occurrence_dates:
-            if occ_date not in existing_dates:
-                new_pe = ProjectedExpense(
-                    name=recurring.name,
-                    amount=recurring.amount,
-                    date=occ_date,
-                    connelaide_category_id=recurring.connelaide_category_id,
-                    note=recurring.note,
-                    recurring_expense_id=recurring.id
-                )
-                db.add(new_pe)
+    occurrences = [
+        (recurring, occ_date)
+        for recurring in recurring_expenses
+        for occ_date in compute_occurrence_dates(recurring, start_date, end_date)
+    ]
+    if not occurrences:
+        return
+
+    # One lookup for every recurring expense's existing instances in range
+    existing = set(
+        db.query(ProjectedExpense.recurring_expense_id, ProjectedExpense.date).filter(
+            ProjectedExpense.recurring_expense_id.in_({recurring.id for recurring, _ in occurrences}),
+            ProjectedExpense.date >= start_date,
+            ProjectedExpense.date <= end_date
+        ).all()
+    )
 
+    new_rows = [
+        {
+            "name": recurring.name,
+            "amount": recurring.amount,
+            "date": occ_date,
+            "connelaide_category_id": recurring.connelaide_category_id,
+            "note": recurring.note,
+            "recurring_expense_id": recurring.id,
+        }
+        for recurring, occ_date in occurrences
+        if (recurring.id, occ_date) not in existing
+    ]
+    if not new_rows:
+        return
+
+    # A concurrent request may have generated the same instances since the lookup
+    db.execute(
+        pg_insert(ProjectedExpense).on_conflict_do_nothing(
+            index_elements=[ProjectedExpense.recurring_expense_id, ProjectedExpense.date],
+            index_where=ProjectedExpense.recurring_expense_id.isnot(None)
+        ),
+        new_rows
+    )
     db.commit()
 
 
@@ -560,86 +949,76 @@ def generate_recurring_projected_expenses(db: Session, start_date: str, end_date
 # Projected Expenses Endpoints
 # ============================================
 
-@app.get("/api/v1/projected-expenses", response_model=List[ProjectedExpenseResponse])
-async def get_projected_expenses(
-    start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
-    end_date: str = Query(..., description="End date (YYYY-MM-DD)"),
+@app.get(
+    "/api/v1/projected-expenses",
+    response_model=None,
+    responses={200: {"model": List[ProjectedExpenseResponse]}}
+)
+def get_projected_expenses(
+    start_date: date_type = Query(..., description="Start date (YYYY-MM-DD)"),
+    end_date: date_type = Query(..., description="End date (YYYY-MM-DD)"),
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get projected expenses within a date range, excluding merged ones by default"""
     generate_recurring_projected_expenses(db, start_date, end_date)
 
-    expenses = db.query(ProjectedExpense)\
-        .options(joinedload(ProjectedExpense.category))\
+    expenses = db.query(
+        *PROJECTED_EXPENSE_LIST_COLUMNS,
+        ConnalaideCategory.name.label("connelaide_category")
+    )\
+        .outerjoin(ConnalaideCategory, ProjectedExpense.connelaide_category_id == ConnalaideCategory.id)\
         .filter(ProjectedExpense.date >= start_date)\
         .filter(ProjectedExpense.date <= end_date)\
         .filter(ProjectedExpense.merged_transaction_id == None)\
         .order_by(ProjectedExpense.date.desc())\
         .all()
 
-    for e in expenses:
-        e.connelaide_category = e.category.name if e.category else None
-
-    return expenses
+    return json_response(PROJECTED_EXPENSE_LIST_ADAPTER, [row._asdict() for row in expenses])
 
 
 @app.post("/api/v1/projected-expenses", response_model=ProjectedExpenseResponse, status_code=status.HTTP_201_CREATED)
-async def create_projected_expense(
+def create_projected_expense(
     expense_data: ProjectedExpenseCreate,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new projected expense"""
     if expense_data.connelaide_category_id is not None:
-        category = db.query(ConnalaideCategory).filter(
-            ConnalaideCategory.id == expense_data.connelaide_category_id
-        ).first()
-        if not category:
-            raise HTTPException(status_code=400, detail="Category not found")
+        ensure_category_exists(db, expense_data.connelaide_category_id)
 
-    expense = ProjectedExpense(
+    # Insert and read back the new row with its category name in a single statement
+    inserted = insert(ProjectedExpense).values(
         name=expense_data.name,
         amount=expense_data.amount,
         date=expense_data.date,
         connelaide_category_id=expense_data.connelaide_category_id,
         note=expense_data.note
-    )
-    db.add(expense)
-    db.commit()
-    db.refresh(expense)
+    ).returning(*PROJECTED_EXPENSE_LIST_COLUMNS).cte("inserted")
 
-    # Eagerly load category for response
-    if expense.connelaide_category_id:
-        db.refresh(expense, ['category'])
-    expense.connelaide_category = expense.category.name if expense.category else None
+    with category_write_guard(db):
+        expense = db.execute(
+            select(inserted, ConnalaideCategory.name.label("connelaide_category"))
+            .outerjoin(ConnalaideCategory, inserted.c.connelaide_category_id == ConnalaideCategory.id)
+        ).one()
+        db.commit()
 
     return expense
 
 
 @app.patch("/api/v1/projected-expenses/{expense_id}", response_model=ProjectedExpenseResponse)
-async def update_projected_expense(
+def update_projected_expense(
     expense_id: int,
     updates: ProjectedExpenseUpdate,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update a projected expense"""
-    expense = db.query(ProjectedExpense)\
-        .options(joinedload(ProjectedExpense.category))\
-        .filter(ProjectedExpense.id == expense_id).first()
-    if not expense:
-        raise HTTPException(status_code=404, detail="Projected expense not found")
-
     update_data = updates.model_dump(exclude_unset=True)
 
     # Validate category_id if provided
     if 'connelaide_category_id' in update_data and update_data['connelaide_category_id'] is not None:
-        category = db.query(ConnalaideCategory).filter(
-            ConnalaideCategory.id == update_data['connelaide_category_id']
-        ).first()
-        if not category:
-            raise HTTPException(status_code=400, detail="Category not found")
+        ensure_category_exists(db, update_data['connelaide_category_id'])
 
     # Validate merged_transaction_id if provided
     if 'merged_transaction_id' in update_data and update_data['merged_transaction_id'] is not None:
@@ -649,19 +1028,25 @@ async def update_projected_expense(
         if not transaction:
             raise HTTPException(status_code=400, detail="Transaction not found")
 
-    for field, value in update_data.items():
-        setattr(expense, field, value)
-
-    db.commit()
-    db.refresh(expense)
+    # Generated instances are unique per recurring expense and date
+    try:
+        with category_write_guard(db):
+            expense = patch_row(db, ProjectedExpense, expense_id, update_data)
+            db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if e.orig.diag.constraint_name != "ix_projected_expenses_recurring_date":
+            raise
+        raise HTTPException(status_code=400, detail="This recurring expense already has a projected expense on that date")
 
-    expense.connelaide_category = expense.category.name if expense.category else None
+    if not expense:
+        raise HTTPException(status_code=404, detail="Projected expense not found")
 
     return expense
 
 
 @app.delete("/api/v1/projected-expenses/{expense_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_projected_expense(
+def delete_projected_expense(
     expense_id: int,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -680,25 +1065,29 @@ async def delete_projected_expense(
 # Recurring Expenses Endpoints
 # ============================================
 
-@app.get("/api/v1/recurring-expenses", response_model=List[RecurringExpenseResponse])
-async def get_recurring_expenses(
+@app.get(
+    "/api/v1/recurring-expenses",
+    response_model=None,
+    responses={200: {"model": List[RecurringExpenseResponse]}}
+)
+def get_recurring_expenses(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get all recurring expenses ordered by name"""
-    expenses = db.query(RecurringExpense)\
-        .options(joinedload(RecurringExpense.category))\
+    expenses = db.query(
+        *RECURRING_EXPENSE_LIST_COLUMNS,
+        ConnalaideCategory.name.label("connelaide_category")
+    )\
+        .outerjoin(ConnalaideCategory, RecurringExpense.connelaide_category_id == ConnalaideCategory.id)\
         .order_by(RecurringExpense.name)\
         .all()
 
-    for e in expenses:
-        e.connelaide_category = e.category.name if e.category else None
-
-    return expenses
+    return json_response(RECURRING_EXPENSE_LIST_ADAPTER, [row._asdict() for row in expenses])
 
 
 @app.post("/api/v1/recurring-expenses", response_model=RecurringExpenseResponse, status_code=status.HTTP_201_CREATED)
-async def create_recurring_expense(
+def create_recurring_expense(
     expense_data: RecurringExpenseCreate,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -713,11 +1102,7 @@ async def create_recurring_expense(
             raise HTTPException(status_code=400, detail="month_of_year must be between 1 and 12 for yearly frequency")
 
     if expense_data.connelaide_category_id is not None:
-        category = db.query(ConnalaideCategory).filter(
-            ConnalaideCategory.id == expense_data.connelaide_category_id
-        ).first()
-        if not category:
-            raise HTTPException(status_code=400, detail="Category not found")
+        ensure_category_exists(db, expense_data.connelaide_category_id)
 
     expense = RecurringExpense(
         name=expense_data.name,
@@ -731,27 +1116,24 @@ async def create_recurring_expense(
         note=expense_data.note
     )
     db.add(expense)
-    db.commit()
+    with category_write_guard(db):
+        db.commit()
     db.refresh(expense)
 
-    if expense.connelaide_category_id:
-        db.refresh(expense, ['category'])
-    expense.connelaide_category = expense.category.name if expense.category else None
+    expense.connelaide_category = get_category_name(db, expense.connelaide_category_id)
 
     return expense
 
 
 @app.patch("/api/v1/recurring-expenses/{expense_id}", response_model=RecurringExpenseResponse)
-async def update_recurring_expense(
+def update_recurring_expense(
     expense_id: int,
     updates: RecurringExpenseUpdate,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update a recurring expense. Deletes future untouched generated instances so they regenerate."""
-    expense = db.query(RecurringExpense)\
-        .options(joinedload(RecurringExpense.category))\
-        .filter(RecurringExpense.id == expense_id).first()
+    expense = db.query(RecurringExpense).filter(RecurringExpense.id == expense_id).first()
     if not expense:
         raise HTTPException(status_code=404, detail="Recurring expense not found")
 
@@ -765,35 +1147,32 @@ async def update_recurring_expense(
 
     # Validate category if provided
     if 'connelaide_category_id' in update_data and update_data['connelaide_category_id'] is not None:
-        category = db.query(ConnalaideCategory).filter(
-            ConnalaideCategory.id == update_data['connelaide_category_id']
-        ).first()
-        if not category:
-            raise HTTPException(status_code=400, detail="Category not found")
+        ensure_category_exists(db, update_data['connelaide_category_id'])
 
     for field, value in update_data.items():
         setattr(expense, field, value)
 
     # Delete future untouched generated projected expenses so they regenerate with new values
-    today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    today = datetime.now(timezone.utc).date()
     db.query(ProjectedExpense).filter(
         ProjectedExpense.recurring_expense_id == expense_id,
-        ProjectedExpense.date > today_str,
+        ProjectedExpense.date > today,
         ProjectedExpense.is_struck_out == False,
         ProjectedExpense.merged_transaction_id == None,
         ProjectedExpense.updated_at == None
     ).delete(synchronize_session=False)
 
-    db.commit()
+    with category_write_guard(db):
+        db.commit()
     db.refresh(expense)
 
-    expense.connelaide_category = expense.category.name if expense.category else None
+    expense.connelaide_category = get_category_name(db, expense.connelaide_category_id)
 
     return expense
 
 
 @app.delete("/api/v1/recurring-expenses/{expense_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_recurring_expense(
+def delete_recurring_expense(
     expense_id: int,
     delete_future: bool = Query(True, description="Delete future untouched generated instances"),
     current_user: dict = Depends(get_current_user),
@@ -804,13 +1183,13 @@ async def delete_recurring_expense(
     if not expense:
         raise HTTPException(status_code=404, detail="Recurring expense not found")
 
-    today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    today = datetime.now(timezone.utc).date()
 
     if delete_future:
         # Delete future untouched instances
         db.query(ProjectedExpense).filter(
             ProjectedExpense.recurring_expense_id == expense_id,
-            ProjectedExpense.date > today_str,
+            ProjectedExpense.date > today,
             ProjectedExpense.is_struck_out == False,
             ProjectedExpense.merged_transaction_id == None,
             ProjectedExpense.updated_at == None
@@ -0,0 +1,55 @@
+"""
+Migration script to add indexes that back the API's list queries.
+
+This script:
+1. Adds a composite (date, transaction_id) index on transactions for the
+   date range filter and ordering used by GET /api/v1/transactions
+2. Adds a partial date index on projected_expenses covering only unmerged
+   expenses, for GET /api/v1/projected-expenses
+3. Adds an (end_date, start_date) index on pay_periods for the pay period
+   overlap check
+
+Indexes are built CONCURRENTLY so the tables stay writable during the build.
+New databases get these indexes from init_db.py; this is for existing ones.
+"""
+
+from sqlalchemy import text
+from database import engine
+
+
+INDEXES = [
+    ("ix_transactions_date_transaction_id", "transactions (date, transaction_id)"),
+    ("ix_projected_expenses_open_date", "projected_expenses (date) WHERE merged_transaction_id IS NULL"),
+    ("ix_pay_periods_end_date_start_date", "pay_periods (end_date, start_date)"),
+]
+
+
+def migrate():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for name, definition in INDEXES:
+            print(f"Creating index {name}...")
+            conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition};"))
+
+        print("\nMigration complete!")
+
+
+def rollback():
+    """Rollback the migration if needed."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        print("Rolling back migration...")
+
+        for name, _ in reversed(INDEXES):
+            print(f"Dropping index {name}...")
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name};"))
+
+        print("Rollback complete!")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--rollback":
+        rollback()
+    else:
+        migrate()
@@ -3,9 +3,12 @@ Migration script to convert connelaide_category from string to foreign key.
 
 This script:
 1. Adds the new connelaide_category_id column
-2. Ensures all existing category strings exist in connalaide_categories
-3. Maps existing string values to their category IDs
-4. Adds a foreign key constraint
+2. Creates any missing categories and maps existing string values to
+   their category IDs in a single statement
+3. Adds a foreign key constraint
+
+All steps run in a single transaction, so a failure leaves the schema
+untouched and the whole migration commits with one WAL flush.
 
 Run this script BEFORE deploying the updated API code.
 """
@@ -15,40 +18,45 @@ from database import engine
 
 
 def migrate():
-    with engine.connect() as conn:
+    with engine.begin() as conn:
         # Step 1: Add new column
         print("Adding connelaide_category_id column...")
         conn.execute(text("""
             ALTER TABLE transactions
             ADD COLUMN IF NOT EXISTS connelaide_category_id INTEGER;
         """))
-        conn.commit()
-
-        # Step 2: Insert any missing categories from transactions
-        print("Inserting missing categories...")
-        conn.execute(text("""
-            INSERT INTO connalaide_categories (name, created_at)
-            SELECT DISTINCT t.connelaide_category, NOW()
-            FROM transactions t
-            WHERE t.connelaide_category IS NOT NULL
-            AND t.connelaide_category NOT IN (SELECT name FROM connalaide_categories)
-            ON CONFLICT (name) DO NOTHING;
-        """))
-        conn.commit()
 
-        # Step 3: Map strings to IDs
-        print("Mapping category strings to IDs...")
+        # Step 2: Insert missing categories and map strings to IDs.
+        # The UPDATE can't see rows inserted by the CTE in the same statement,
+        # so the id map is the inserted rows plus the pre-existing categories.
+        print("Inserting missing categories and mapping category strings to IDs...")
         result = conn.execute(text("""
+            WITH distinct_categories AS (
+                SELECT DISTINCT connelaide_category AS name
+                FROM transactions
+                WHERE connelaide_category IS NOT NULL
+                AND connelaide_category_id IS NULL
+            ),
+            inserted AS (
+                INSERT INTO connalaide_categories (name, created_at)
+                SELECT name, NOW() FROM distinct_categories
+                ON CONFLICT (name) DO NOTHING
+                RETURNING id, name
+            ),
+            category_map AS (
+                SELECT id, name FROM inserted
+                UNION ALL
+                SELECT id, name FROM connalaide_categories
+            )
             UPDATE transactions t
-            SET connelaide_category_id = c.id
-            FROM connalaide_categories c
-            WHERE t.connelaide_category = c.name
+            SET connelaide_category_id = m.id
+            FROM category_map m
+            WHERE t.connelaide_category = m.name
             AND t.connelaide_category_id IS NULL;
         """))
-        conn.commit()
         print(f"  Updated {result.rowcount} transactions with category IDs")
 
-        # Step 4: Add foreign key constraint (check if it doesn't already exist)
+        # Step 3: Add foreign key constraint (check if it doesn't already exist)
         print("Adding foreign key constraint...")
         # Check if constraint exists first
         constraint_check = conn.execute(text("""
@@ -62,7 +70,6 @@ def migrate():
                 FOREIGN KEY (connelaide_category_id)
                 REFERENCES connalaide_categories(id);
             """))
-            conn.commit()
             print("  Foreign key constraint added")
         else:
             print("  Foreign key constraint already exists, skipping")
@@ -72,12 +79,12 @@ def migrate():
         print("1. Deploy the updated API backend")
         print("2. Deploy the updated Lambda")
         print("3. Deploy the updated frontend")
-        print("4. Later: Remove the old connelaide_category string column")
+        print("4. Later: Remove the old connelaide_category string column (migrate_drop_legacy_category.py)")
 
 
 def rollback():
     """Rollback the migration if needed."""
-    with engine.connect() as conn:
+    with engine.begin() as conn:
         print("Rolling back migration...")
 
         # Remove foreign key constraint
@@ -85,14 +92,12 @@ def rollback():
             ALTER TABLE transactions
             DROP CONSTRAINT IF EXISTS fk_transactions_category;
         """))
-        conn.commit()
 
         # Remove the new column
         conn.execute(text("""
             ALTER TABLE transactions
             DROP COLUMN IF EXISTS connelaide_category_id;
         """))
-        conn.commit()
 
         print("Rollback complete!")
 
@@ -0,0 +1,84 @@
+"""
+Migration script to convert YYYY-MM-DD string date columns to DATE.
+
+This script:
+1. Converts transactions.date, projected_expenses.date,
+   pay_periods.start_date/end_date and recurring_expenses.start_date/end_date
+   from VARCHAR to DATE
+
+DATE values are 4 bytes and compare as integers, so range filters and
+ordering on these columns no longer go through string collation. Existing
+indexes on the columns are rebuilt as part of the type change.
+
+ALTER COLUMN ... TYPE rewrites each table under an ACCESS EXCLUSIVE lock,
+so run this during a quiet window. All columns convert in one transaction;
+a value that is not a valid date aborts the whole migration.
+
+Run this script BEFORE deploying the updated API code. Writers that send
+'YYYY-MM-DD' strings (e.g. the Plaid fetcher Lambda) keep working, since
+Postgres casts the string literals to DATE on insert.
+"""
+
+from sqlalchemy import text
+from database import engine
+
+
+# (table, column, original VARCHAR length)
+DATE_COLUMNS = [
+    ("transactions", "date", 50),
+    ("projected_expenses", "date", 50),
+    ("pay_periods", "start_date", 10),
+    ("pay_periods", "end_date", 10),
+    ("recurring_expenses", "start_date", 10),
+    ("recurring_expenses", "end_date", 10),
+]
+
+
+def _column_type(conn, table: str, column: str) -> str:
+    return conn.execute(text("""
+        SELECT data_type FROM information_schema.columns
+        WHERE table_name = :table AND column_name = :column;
+    """), {"table": table, "column": column}).scalar()
+
+
+def migrate():
+    with engine.begin() as conn:
+        for table, column, _ in DATE_COLUMNS:
+            if _column_type(conn, table, column) == "date":
+                print(f"  {table}.{column} is already DATE, skipping")
+                continue
+
+            print(f"Converting {table}.{column} to DATE...")
+            conn.execute(text(f"""
+                ALTER TABLE {table}
+                ALTER COLUMN {column} TYPE DATE USING {column}::date;
+            """))
+
+    print("\nMigration complete!")
+
+
+def rollback():
+    """Rollback the migration if needed."""
+    with engine.begin() as conn:
+        print("Rolling back migration...")
+
+        for table, column, length in reversed(DATE_COLUMNS):
+            if _column_type(conn, table, column) != "date":
+                continue
+
+            print(f"Converting {table}.{column} back to VARCHAR({length})...")
+            conn.execute(text(f"""
+                ALTER TABLE {table}
+                ALTER COLUMN {column} TYPE VARCHAR({length}) USING to_char({column}, 'YYYY-MM-DD');
+            """))
+
+    print("Rollback complete!")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--rollback":
+        rollback()
+    else:
+        migrate()
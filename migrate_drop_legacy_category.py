@@ -0,0 +1,99 @@
+"""
+Migration script to drop the legacy transactions.connelaide_category column.
+
+This script:
+1. Maps any remaining connelaide_category strings without a category ID to
+   their category (creating missing categories), as migrate_category_to_fk.py did
+2. Drops the connelaide_category column
+
+The API reads category names only through connelaide_category_id, so the
+string column is dead weight on every transaction row. Both steps run in a
+single transaction, so no category string is lost if the drop fails.
+
+Run migrate_category_to_fk.py first, and deploy the updated API code
+BEFORE running this script.
+"""
+
+from sqlalchemy import text
+from database import engine
+
+
+def _column_exists(conn) -> bool:
+    return conn.execute(text("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'transactions' AND column_name = 'connelaide_category';
+    """)).first() is not None
+
+
+def migrate():
+    with engine.begin() as conn:
+        if not _column_exists(conn):
+            print("  transactions.connelaide_category already dropped, skipping")
+            return
+
+        # Step 1: Backfill any category strings that never got an ID
+        print("Mapping remaining category strings to IDs...")
+        result = conn.execute(text("""
+            WITH distinct_categories AS (
+                SELECT DISTINCT connelaide_category AS name
+                FROM transactions
+                WHERE connelaide_category IS NOT NULL
+                AND connelaide_category_id IS NULL
+            ),
+            inserted AS (
+                INSERT INTO connalaide_categories (name, created_at)
+                SELECT name, NOW() FROM distinct_categories
+                ON CONFLICT (name) DO NOTHING
+                RETURNING id, name
+            ),
+            category_map AS (
+                SELECT id, name FROM inserted
+                UNION ALL
+                SELECT id, name FROM connalaide_categories
+            )
+            UPDATE transactions t
+            SET connelaide_category_id = m.id
+            FROM category_map m
+            WHERE t.connelaide_category = m.name
+            AND t.connelaide_category_id IS NULL;
+        """))
+        print(f"  Updated {result.rowcount} transactions with category IDs")
+
+        # Step 2: Drop the legacy column
+        print("Dropping transactions.connelaide_category...")
+        conn.execute(text("""
+            ALTER TABLE transactions
+            DROP COLUMN connelaide_category;
+        """))
+
+    print("\nMigration complete!")
+
+
+def rollback():
+    """Rollback the migration if needed."""
+    with engine.begin() as conn:
+        print("Rolling back migration...")
+
+        # Restore the column from each transaction's category name
+        conn.execute(text("""
+            ALTER TABLE transactions
+            ADD COLUMN IF NOT EXISTS connelaide_category VARCHAR(300);
+        """))
+        conn.execute(text("""
+            UPDATE transactions t
+            SET connelaide_category = c.name
+            FROM connalaide_categories c
+            WHERE t.connelaide_category_id = c.id
+            AND t.connelaide_category IS NULL;
+        """))
+
+    print("Rollback complete!")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--rollback":
+        rollback()
+    else:
+        migrate()
@@ -0,0 +1,82 @@
+"""
+Migration script to store money columns as NUMERIC(12,2) instead of
+double precision.
+
+This script:
+1. Converts every amount/budget column to NUMERIC(12,2), rounding
+   existing values to whole cents
+
+Floats can't represent most cent values exactly, so stored amounts drift
+(e.g. 0.1 + 0.2) and any sum over them inherits the error. NUMERIC keeps
+exact cents; the API still reads and returns them as floats.
+
+ALTER COLUMN ... TYPE rewrites each table under an ACCESS EXCLUSIVE lock,
+so run this during a quiet window. All columns convert in one transaction.
+
+Writers that send floats (e.g. the Plaid fetcher Lambda) keep working,
+since Postgres rounds them to cents on insert.
+"""
+
+from sqlalchemy import text
+from database import engine
+
+
+# (table, column)
+MONEY_COLUMNS = [
+    ("transactions", "amount"),
+    ("transactions", "edited_amount"),
+    ("connalaide_categories", "target_budget"),
+    ("projected_expenses", "amount"),
+    ("recurring_expenses", "amount"),
+    ("pay_periods", "checking_budget"),
+]
+
+
+def _column_type(conn, table: str, column: str) -> str:
+    return conn.execute(text("""
+        SELECT data_type FROM information_schema.columns
+        WHERE table_name = :table AND column_name = :column;
+    """), {"table": table, "column": column}).scalar()
+
+
+def migrate():
+    with engine.begin() as conn:
+        for table, column in MONEY_COLUMNS:
+            if _column_type(conn, table, column) == "numeric":
+                print(f"  {table}.{column} is already NUMERIC, skipping")
+                continue
+
+            print(f"Converting {table}.{column} to NUMERIC(12,2)...")
+            conn.execute(text(f"""
+                ALTER TABLE {table}
+                ALTER COLUMN {column} TYPE NUMERIC(12,2) USING round({column}::numeric, 2);
+            """))
+
+    print("\nMigration complete!")
+
+
+def rollback():
+    """Rollback the migration if needed."""
+    with engine.begin() as conn:
+        print("Rolling back migration...")
+
+        for table, column in reversed(MONEY_COLUMNS):
+            if _column_type(conn, table, column) != "numeric":
+                continue
+
+            print(f"Converting {table}.{column} back to DOUBLE PRECISION...")
+            conn.execute(text(f"""
+                ALTER TABLE {table}
+                ALTER COLUMN {column} TYPE DOUBLE PRECISION;
+            """))
+
+    print("Rollback complete!")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--rollback":
+        rollback()
+    else:
+        migrate()
@@ -0,0 +1,81 @@
+"""
+Migration script to make generated projected expenses unique per
+recurring expense and date.
+
+This script:
+1. Deletes duplicate generated instances left by concurrent generation,
+   keeping the oldest, as long as the duplicates were never edited,
+   struck out or merged
+2. Adds a partial unique index on projected_expenses
+   (recurring_expense_id, date) WHERE recurring_expense_id IS NOT NULL
+
+The index lets generation insert with ON CONFLICT DO NOTHING, so two
+requests generating the same range can't create the same instance twice.
+Manually created expenses (no recurring_expense_id) are not constrained.
+
+Both steps run in one transaction. If edited duplicates remain, the script
+lists them and changes nothing; resolve those by hand and rerun.
+"""
+
+from sqlalchemy import text
+from database import engine
+
+
+def migrate():
+    with engine.begin() as conn:
+        # Step 1: Remove untouched duplicates
+        print("Removing duplicate generated projected expenses...")
+        result = conn.execute(text("""
+            DELETE FROM projected_expenses p
+            USING projected_expenses keep
+            WHERE p.recurring_expense_id = keep.recurring_expense_id
+            AND p.date = keep.date
+            AND p.id > keep.id
+            AND p.updated_at IS NULL
+            AND p.merged_transaction_id IS NULL
+            AND p.is_struck_out IS NOT TRUE;
+        """))
+        print(f"  Deleted {result.rowcount} duplicates")
+
+        remaining = conn.execute(text("""
+            SELECT recurring_expense_id, date, array_agg(id ORDER BY id)
+            FROM projected_expenses
+            WHERE recurring_expense_id IS NOT NULL
+            GROUP BY recurring_expense_id, date
+            HAVING count(*) > 1;
+        """)).all()
+        if remaining:
+            for recurring_expense_id, date, ids in remaining:
+                print(f"  Edited duplicates for recurring expense {recurring_expense_id} on {date}: {ids}")
+            raise SystemExit("Resolve the duplicates above, then rerun the migration")
+
+        # Step 2: Add the unique index
+        print("Creating index ix_projected_expenses_recurring_date...")
+        conn.execute(text("""
+            CREATE UNIQUE INDEX IF NOT EXISTS ix_projected_expenses_recurring_date
+            ON projected_expenses (recurring_expense_id, date)
+            WHERE recurring_expense_id IS NOT NULL;
+        """))
+
+    print("\nMigration complete!")
+
+
+def rollback():
+    """Rollback the migration if needed."""
+    with engine.begin() as conn:
+        print("Rolling back migration...")
+
+        conn.execute(text("""
+            DROP INDEX IF EXISTS ix_projected_expenses_recurring_date;
+        """))
+
+    print("Rollback complete!")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--rollback":
+        rollback()
+    else:
+        migrate()
@@ -0,0 +1,74 @@
+"""
+Migration script to drop redundant indexes and index the category FK.
+
+This script:
+1. Drops single-column indexes no query uses or that a composite index
+   already covers:
+   - transactions (account_id) and (account_name): nothing filters on them
+   - transactions (date): the leading column of (date, transaction_id)
+   - pay_periods (end_date): the leading column of (end_date, start_date)
+2. Adds an index on transactions (connelaide_category_id) so deleting a
+   category can find the transactions referencing it without a seq scan
+
+Every index on transactions is maintained on each Plaid insert, so
+unused ones only cost write time and space.
+
+Indexes are dropped and built CONCURRENTLY so the tables stay writable.
+Run migrate_add_query_indexes.py first, since the composites replace the
+dropped indexes.
+"""
+
+from sqlalchemy import text
+from database import engine
+
+
+# (index name, definition) of indexes that are now redundant
+DROPPED_INDEXES = [
+    ("ix_transactions_account_id", "transactions (account_id)"),
+    ("ix_transactions_account_name", "transactions (account_name)"),
+    ("ix_transactions_date", "transactions (date)"),
+    ("ix_pay_periods_end_date", "pay_periods (end_date)"),
+]
+
+ADDED_INDEXES = [
+    ("ix_transactions_connelaide_category_id", "transactions (connelaide_category_id)"),
+]
+
+
+def migrate():
+    # DROP/CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for name, definition in ADDED_INDEXES:
+            print(f"Creating index {name}...")
+            conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition};"))
+
+        for name, _ in DROPPED_INDEXES:
+            print(f"Dropping index {name}...")
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name};"))
+
+        print("\nMigration complete!")
+
+
+def rollback():
+    """Rollback the migration if needed."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        print("Rolling back migration...")
+
+        for name, definition in DROPPED_INDEXES:
+            print(f"Recreating index {name}...")
+            conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition};"))
+
+        for name, _ in ADDED_INDEXES:
+            print(f"Dropping index {name}...")
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name};"))
+
+        print("Rollback complete!")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--rollback":
+        rollback()
+    else:
+        migrate()
@@ -0,0 +1,67 @@
+"""
+Migration script to track background refreshes separately from completed ones.
+
+This script:
+1. Adds refresh_metadata.refresh_requested_at and refresh_metadata.refresh_job_id
+2. Makes refresh_metadata.last_refreshed_at nullable
+
+A refresh queued with wait=false only records when it was requested and the
+Lambda request id; last_refreshed_at still moves only when a fetch is known to
+have finished. The first refresh may be a background one, so the metadata row
+can exist before any fetch has completed.
+
+Deploy the updated API code AFTER running this script.
+"""
+
+from sqlalchemy import text
+from database import engine
+
+
+def migrate():
+    with engine.begin() as conn:
+        print("Adding refresh request columns...")
+        conn.execute(text("""
+            ALTER TABLE refresh_metadata
+            ADD COLUMN IF NOT EXISTS refresh_requested_at TIMESTAMP WITH TIME ZONE,
+            ADD COLUMN IF NOT EXISTS refresh_job_id VARCHAR(100);
+        """))
+
+        print("Making last_refreshed_at nullable...")
+        conn.execute(text("""
+            ALTER TABLE refresh_metadata
+            ALTER COLUMN last_refreshed_at DROP NOT NULL;
+        """))
+
+    print("\nMigration complete!")
+
+
+def rollback():
+    """Rollback the migration if needed."""
+    with engine.begin() as conn:
+        print("Rolling back migration...")
+
+        # Rows that only ever saw a background refresh have nothing to restore
+        conn.execute(text("""
+            DELETE FROM refresh_metadata
+            WHERE last_refreshed_at IS NULL;
+        """))
+        conn.execute(text("""
+            ALTER TABLE refresh_metadata
+            ALTER COLUMN last_refreshed_at SET NOT NULL;
+        """))
+        conn.execute(text("""
+            ALTER TABLE refresh_metadata
+            DROP COLUMN IF EXISTS refresh_job_id,
+            DROP COLUMN IF EXISTS refresh_requested_at;
+        """))
+
+    print("Rollback complete!")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--rollback":
+        rollback()
+    else:
+        migrate()
@@ -1,31 +1,40 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, Numeric, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
 
+# Money is stored as exact cents but read back as float, which is what the API returns
+Money = Numeric(12, 2, asdecimal=False)
+
 class Transaction(Base):
     """Model for storing financial transactions from Plaid"""
     __tablename__ = "transactions"
 
     id = Column(Integer, primary_key=True, index=True)
     transaction_id = Column(String(255), unique=True, nullable=False, index=True)
-    account_name = Column(String(255), nullable=False, index=True)
-    account_id = Column(String(255), nullable=False, index=True)
-    date = Column(String(50), nullable=False, index=True)
+    account_name = Column(String(255), nullable=False)
+    account_id = Column(String(255), nullable=False)
+    date = Column(Date, nullable=False)
     name = Column(String(500), nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)
     pending = Column(Boolean, default=False)
     merchant_name = Column(String(255))
     plaid_generated_category = Column(String(255))
-    connelaide_category = Column(String(300))  # Legacy: kept for migration, use connelaide_category_id
     connelaide_category_id = Column(Integer, ForeignKey('connalaide_categories.id'), nullable=True)
     category = relationship("ConnalaideCategory", back_populates="transactions")
-    edited_amount = Column(Float)
+    edited_amount = Column(Money)
     note = Column(String(700))
     impacts_checking_balance = Column(String(20), default='review_required')
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        # Serves the date range filter and (date, transaction_id) ordering of the transactions list
+        Index('ix_transactions_date_transaction_id', 'date', 'transaction_id'),
+        # Lets deleting a category find the transactions that reference it without a seq scan
+        Index('ix_transactions_connelaide_category_id', 'connelaide_category_id'),
+    )
+
     def __repr__(self):
         return f"<Transaction(id={self.id}, date={self.date}, name={self.name}, amount={self.amount})>"
 
@@ -36,7 +45,9 @@ class RefreshMetadata(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     key = Column(String(100), unique=True, nullable=False, index=True)  # "plaid_transactions"
-    last_refreshed_at = Column(DateTime(timezone=True), nullable=False)
+    last_refreshed_at = Column(DateTime(timezone=True), nullable=True)  # last fetch known to have finished
+    refresh_requested_at = Column(DateTime(timezone=True), nullable=True)  # last background fetch queued
+    refresh_job_id = Column(String(100), nullable=True)  # Lambda request id of that background fetch
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -50,7 +61,7 @@ class ConnalaideCategory(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), unique=True, nullable=False, index=True)
-    target_budget = Column(Float, nullable=True)
+    target_budget = Column(Money, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -66,8 +77,8 @@ class ProjectedExpense(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(500), nullable=False)
-    amount = Column(Float, nullable=False)
-    date = Column(String(50), nullable=False, index=True)  # YYYY-MM-DD
+    amount = Column(Money, nullable=False)
+    date = Column(Date, nullable=False, index=True)
     connelaide_category_id = Column(Integer, ForeignKey('connalaide_categories.id'), nullable=True)
     category = relationship("ConnalaideCategory")
     note = Column(String(700))
@@ -78,6 +89,21 @@ class ProjectedExpense(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        # Serves the projected expenses list, which only shows unmerged expenses by date
+        Index(
+            'ix_projected_expenses_open_date', 'date',
+            postgresql_where=merged_transaction_id.is_(None)
+        ),
+        # One generated instance per recurring expense and date, so generation can
+        # insert with ON CONFLICT DO NOTHING and concurrent requests can't duplicate
+        Index(
+            'ix_projected_expenses_recurring_date', 'recurring_expense_id', 'date',
+            unique=True,
+            postgresql_where=recurring_expense_id.isnot(None)
+        ),
+    )
+
     def __repr__(self):
         return f"<ProjectedExpense(id={self.id}, date={self.date}, name={self.name}, amount={self.amount})>"
 
@@ -87,12 +113,12 @@ class RecurringExpense(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(500), nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)
     frequency = Column(String(10), nullable=False)   # 'monthly' or 'yearly'
     day_of_month = Column(Integer, nullable=False)    # 1-31
     month_of_year = Column(Integer, nullable=True)    # 1-12, only for yearly
-    start_date = Column(String(10), nullable=False, index=True)  # YYYY-MM-DD
-    end_date = Column(String(10), nullable=True)      # YYYY-MM-DD, null = indefinite
+    start_date = Column(Date, nullable=False, index=True)
+    end_date = Column(Date, nullable=True)            # null = indefinite
     connelaide_category_id = Column(Integer, ForeignKey('connalaide_categories.id'), nullable=True)
     category = relationship("ConnalaideCategory")
     note = Column(String(700), nullable=True)
@@ -109,11 +135,16 @@ class PayPeriod(Base):
     __tablename__ = "pay_periods"
 
     id = Column(Integer, primary_key=True, index=True)
-    start_date = Column(String(10), nullable=False, index=True)  # YYYY-MM-DD
-    end_date = Column(String(10), nullable=False, index=True)    # YYYY-MM-DD
-    checking_budget = Column(Float, nullable=True)
+    start_date = Column(Date, nullable=False, index=True)
+    end_date = Column(Date, nullable=False)
+    checking_budget = Column(Money, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        # Serves the overlap check (end_date >= :start AND start_date <= :end) as an index range scan
+        Index('ix_pay_periods_end_date_start_date', 'end_date', 'start_date'),
+    )
+
     def __repr__(self):
         return f"<PayPeriod(id={self.id}, start_date={self.start_date}, end_date={self.end_date})>"
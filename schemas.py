@@ -1,27 +1,13 @@
-from pydantic import BaseModel, ConfigDict, Field
-from typing import Optional
-from datetime import datetime
-
-class TransactionBase(BaseModel):
-    transaction_id: str
-    account_name: str
-    account_id: str
-    date: str
-    name: str
-    amount: float
-    pending: bool
-    merchant_name: Optional[str] = None
-    plaid_generated_category: Optional[str] = None
-
-class TransactionCreate(TransactionBase):
-    pass
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
+from typing import List, Optional
+from datetime import datetime, date as date_type
 
 class TransactionResponse(BaseModel):
     id: int
     transaction_id: str
     account_name: str
     account_id: str
-    date: str
+    date: date_type
     description: str = Field(validation_alias="name")
     amount: float
     pending: bool
@@ -48,6 +34,8 @@ class TransactionUpdateRequest(BaseModel):
 class RefreshStatusResponse(BaseModel):
     """Response for refresh status endpoint"""
     last_refreshed_at: Optional[datetime] = None
+    refresh_requested_at: Optional[datetime] = None  # when the last background refresh was queued
+    refresh_job_id: Optional[str] = None
 
 
 class RefreshResponse(BaseModel):
@@ -56,6 +44,7 @@ class RefreshResponse(BaseModel):
     message: str
     transactions_fetched: Optional[int] = None
     last_refreshed_at: Optional[datetime] = None
+    job_id: Optional[str] = None  # Lambda request id when the refresh runs in the background
 
 
 class ConnalaideCategoryBase(BaseModel):
@@ -74,6 +63,14 @@ class ConnalaideCategoryUpdate(BaseModel):
     name: Optional[str] = None
     target_budget: Optional[float] = None
 
+    @field_validator("name")
+    @classmethod
+    def name_not_null(cls, name):
+        # Omitting name leaves it unchanged; an explicit null would clear a required column
+        if name is None:
+            raise ValueError("name cannot be null")
+        return name
+
 
 class ConnalaideCategoryResponse(BaseModel):
     """Response schema for category"""
@@ -94,7 +91,7 @@ class ProjectedExpenseBase(BaseModel):
     """Base schema for Projected Expense"""
     name: str
     amount: float
-    date: str
+    date: date_type
     connelaide_category_id: Optional[int] = None
     note: Optional[str] = None
 
@@ -108,7 +105,7 @@ class ProjectedExpenseUpdate(BaseModel):
     """Schema for updating a projected expense"""
     name: Optional[str] = None
     amount: Optional[float] = None
-    date: Optional[str] = None
+    date: Optional[date_type] = None
     connelaide_category_id: Optional[int] = None
     note: Optional[str] = None
     is_struck_out: Optional[bool] = None
@@ -120,7 +117,7 @@ class ProjectedExpenseResponse(BaseModel):
     id: int
     name: str
     amount: float
-    date: str
+    date: date_type
     connelaide_category_id: Optional[int] = None
     connelaide_category: Optional[str] = None  # Populated from join
     note: Optional[str] = None
@@ -159,8 +156,8 @@ class PayPeriodUpdate(BaseModel):
 class PayPeriodResponse(BaseModel):
     """Response schema for pay period"""
     id: int
-    start_date: str
-    end_date: str
+    start_date: date_type
+    end_date: date_type
     checking_budget: Optional[float] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -178,8 +175,8 @@ class RecurringExpenseBase(BaseModel):
     frequency: str  # 'monthly' or 'yearly'
     day_of_month: int  # 1-31
     month_of_year: Optional[int] = None  # 1-12, required if frequency='yearly'
-    start_date: str  # YYYY-MM-DD
-    end_date: Optional[str] = None
+    start_date: date_type
+    end_date: Optional[date_type] = None
     connelaide_category_id: Optional[int] = None
     note: Optional[str] = None
 
@@ -192,8 +189,8 @@ class RecurringExpenseUpdate(BaseModel):
     frequency: Optional[str] = None
     day_of_month: Optional[int] = None
     month_of_year: Optional[int] = None
-    start_date: Optional[str] = None
-    end_date: Optional[str] = None
+    start_date: Optional[date_type] = None
+    end_date: Optional[date_type] = None
     connelaide_category_id: Optional[int] = None
     note: Optional[str] = None
     is_active: Optional[bool] = None
@@ -205,8 +202,8 @@ class RecurringExpenseResponse(BaseModel):
     frequency: str
     day_of_month: int
     month_of_year: Optional[int] = None
-    start_date: str
-    end_date: Optional[str] = None
+    start_date: date_type
+    end_date: Optional[date_type] = None
     connelaide_category_id: Optional[int] = None
     connelaide_category: Optional[str] = None
     note: Optional[str] = None
@@ -215,3 +212,14 @@ class RecurringExpenseResponse(BaseModel):
     updated_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# Serializers for the read endpoints, compiled once at import so routes can
+# validate rows and write JSON bytes in one pydantic-core pass
+TRANSACTION_ADAPTER = TypeAdapter(TransactionResponse)
+CATEGORY_LIST_ADAPTER = TypeAdapter(List[ConnalaideCategoryResponse])
+CATEGORY_ADAPTER = TypeAdapter(ConnalaideCategoryResponse)
+PAY_PERIOD_LIST_ADAPTER = TypeAdapter(List[PayPeriodResponse])
+PAY_PERIOD_ADAPTER = TypeAdapter(PayPeriodResponse)
+PROJECTED_EXPENSE_LIST_ADAPTER = TypeAdapter(List[ProjectedExpenseResponse])
+RECURRING_EXPENSE_LIST_ADAPTER = TypeAdapter(List[RecurringExpenseResponse])
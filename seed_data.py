@@ -10,6 +10,9 @@ from dotenv import load_dotenv
 # Load local env before any database imports
 load_dotenv(".env.local")
 
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
 from database import SessionLocal
 from models import (
     ConnalaideCategory,
@@ -36,21 +39,36 @@ def seed():
     db = SessionLocal()
     try:
         # --- Categories ---
-        existing_cats = {c.name for c in db.query(ConnalaideCategory).all()}
-        cat_map: dict[str, int] = {}
+        # Insert any missing categories in one statement; names that already
+        # existed are skipped by the conflict clause and looked up afterwards
+        cat_map: dict[str, int] = dict(db.execute(
+            pg_insert(ConnalaideCategory)
+            .values(CATEGORIES)
+            .on_conflict_do_nothing(index_elements=[ConnalaideCategory.name])
+            .returning(ConnalaideCategory.name, ConnalaideCategory.id)
+        ).all())
         for cat in CATEGORIES:
-            if cat["name"] not in existing_cats:
-                obj = ConnalaideCategory(**cat)
-                db.add(obj)
-                db.flush()
-                cat_map[obj.name] = obj.id
+            if cat["name"] in cat_map:
                 print(f"  + Category: {cat['name']}")
-            else:
-                obj = db.query(ConnalaideCategory).filter_by(name=cat["name"]).first()
-                cat_map[obj.name] = obj.id
+
+        existing = [cat["name"] for cat in CATEGORIES if cat["name"] not in cat_map]
+        if existing:
+            cat_map.update(db.execute(
+                select(ConnalaideCategory.name, ConnalaideCategory.id)
+                .where(ConnalaideCategory.name.in_(existing))
+            ).all())
+
+        # Which tables are already seeded, in one round-trip of EXISTS probes
+        has_transactions, has_pay_periods, has_recurring, has_projected, has_refresh = db.execute(select(
+            select(Transaction.id).exists(),
+            select(PayPeriod.id).exists(),
+            select(RecurringExpense.id).exists(),
+            select(ProjectedExpense.id).exists(),
+            select(RefreshMetadata.id).where(RefreshMetadata.key == "plaid_transactions").exists(),
+        )).one()
 
         # --- Transactions ---
-        if db.query(Transaction).count() == 0:
+        if not has_transactions:
             today = _today()
             txns = [
                 # (name, amount, category, days_ago, impacts_checking_balance)
@@ -72,27 +90,29 @@ def seed():
                 ("Parking Garage", -12.00, "Transportation", 15, "true"),
                 ("Oil Change", -55.00, "Transportation", 22, "true"),
             ]
-            for name, amount, cat_name, days_ago, impacts in txns:
-                txn_date = today - timedelta(days=days_ago)
-                db.add(Transaction(
-                    transaction_id=f"seed-{uuid.uuid4().hex[:12]}",
-                    account_name="Checking",
-                    account_id="seed-checking-001",
-                    date=txn_date.isoformat(),
-                    name=name,
-                    amount=amount,
-                    pending=False,
-                    merchant_name=name,
-                    plaid_generated_category=cat_name,
-                    connelaide_category_id=cat_map.get(cat_name),
-                    impacts_checking_balance=impacts,
-                ))
+            # One multi-row INSERT instead of a unit-of-work flush per object
+            db.execute(insert(Transaction), [
+                {
+                    "transaction_id": f"seed-{uuid.uuid4().hex[:12]}",
+                    "account_name": "Checking",
+                    "account_id": "seed-checking-001",
+                    "date": today - timedelta(days=days_ago),
+                    "name": name,
+                    "amount": amount,
+                    "pending": False,
+                    "merchant_name": name,
+                    "plaid_generated_category": cat_name,
+                    "connelaide_category_id": cat_map.get(cat_name),
+                    "impacts_checking_balance": impacts,
+                }
+                for name, amount, cat_name, days_ago, impacts in txns
+            ])
             print(f"  + {len(txns)} transactions")
         else:
             print("  ~ Transactions already exist, skipping")
 
         # --- Pay Period ---
-        if db.query(PayPeriod).count() == 0:
+        if not has_pay_periods:
             today = _today()
             # Current bi-weekly pay period: starts on most recent 1st or 15th
             if today.day >= 15:
@@ -104,8 +124,8 @@ def seed():
                 start = today.replace(day=1)
                 end = today.replace(day=14)
             db.add(PayPeriod(
-                start_date=start.isoformat(),
-                end_date=end.isoformat(),
+                start_date=start,
+                end_date=end,
                 checking_budget=2000.0,
             ))
             print(f"  + Pay period: {start} to {end}")
@@ -113,47 +133,45 @@ def seed():
             print("  ~ Pay periods already exist, skipping")
 
         # --- Recurring Expenses ---
-        if db.query(RecurringExpense).count() == 0:
+        if not has_recurring:
             today = _today()
             recurrings = [
                 {"name": "Rent", "amount": 1500.0, "frequency": "monthly", "day_of_month": 1,
-                 "start_date": (today.replace(day=1) - timedelta(days=60)).isoformat(),
+                 "start_date": (today.replace(day=1) - timedelta(days=60)),
                  "connelaide_category_id": cat_map.get("Rent"), "is_active": True},
                 {"name": "Netflix", "amount": 15.99, "frequency": "monthly", "day_of_month": 2,
-                 "start_date": (today.replace(day=1) - timedelta(days=90)).isoformat(),
+                 "start_date": (today.replace(day=1) - timedelta(days=90)),
                  "connelaide_category_id": cat_map.get("Entertainment"), "is_active": True},
                 {"name": "Internet", "amount": 59.99, "frequency": "monthly", "day_of_month": 8,
-                 "start_date": (today.replace(day=1) - timedelta(days=120)).isoformat(),
+                 "start_date": (today.replace(day=1) - timedelta(days=120)),
                  "connelaide_category_id": cat_map.get("Utilities"), "is_active": True},
             ]
-            for rec in recurrings:
-                db.add(RecurringExpense(**rec))
+            db.execute(insert(RecurringExpense), recurrings)
             print(f"  + {len(recurrings)} recurring expenses")
         else:
             print("  ~ Recurring expenses already exist, skipping")
 
         # --- Projected Expenses ---
-        if db.query(ProjectedExpense).count() == 0:
+        if not has_projected:
             today = _today()
             projected = [
                 {"name": "Car Insurance", "amount": 120.0,
-                 "date": (today + timedelta(days=5)).isoformat(),
+                 "date": today + timedelta(days=5),
                  "connelaide_category_id": cat_map.get("Transportation")},
                 {"name": "Dentist Appointment", "amount": 80.0,
-                 "date": (today + timedelta(days=10)).isoformat(),
+                 "date": today + timedelta(days=10),
                  "note": "Co-pay after insurance"},
                 {"name": "Grocery Restock", "amount": 100.0,
-                 "date": (today + timedelta(days=3)).isoformat(),
+                 "date": today + timedelta(days=3),
                  "connelaide_category_id": cat_map.get("Groceries")},
             ]
-            for proj in projected:
-                db.add(ProjectedExpense(**proj))
+            db.execute(insert(ProjectedExpense), projected)
             print(f"  + {len(projected)} projected expenses")
         else:
             print("  ~ Projected expenses already exist, skipping")
 
         # --- Refresh Metadata ---
-        if db.query(RefreshMetadata).filter_by(key="plaid_transactions").count() == 0:
+        if not has_refresh:
             db.add(RefreshMetadata(
                 key="plaid_transactions",
                 last_refreshed_at=datetime.now(),